@@ -5,6 +5,7 @@ import json
 import time
 import os
 import asyncio
+import heapq
 import aiohttp
 from typing import List, Dict, Any, Optional
 import networkx as nx
@@ -518,9 +519,8 @@ async def _keyword_search_qdrant(query: str, top_k: int, collection_name: str) -
                     "start_line": payload.get('start_line', 0)
                 })
         
-        # Sort by score and return top results
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:top_k]
+        # Select top results without sorting every match (same order as a stable sort)
+        return heapq.nlargest(top_k, results, key=lambda x: x['score'])
         
     except Exception as e:
         print(f"❌ Keyword search error: {e}")
@@ -550,14 +550,13 @@ async def _fallback_search(query: str, top_k: int) -> List[Dict]:
                 results.append({
                     "node_id": node['id'],
                     "score": score,
-                    "snippet": node.get('code', '').split('\n')[0][:100],
+                    "snippet": node.get('code', '').split('\n', 1)[0][:100],
                     "file": node.get('file', ''),
                     "start_line": node.get('start_line', 0)
                 })
         
-        # Sort by score and return top_k
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:top_k]
+        # Select top_k without sorting every match (same order as a stable sort)
+        return heapq.nlargest(top_k, results, key=lambda x: x['score'])
     
     # Ultimate fallback - mock data
     return [
@@ -627,10 +626,14 @@ async def analyze_query(request: AnalyzeRequest):
                 # Prepare snippets for summarizer (it expects node_id and code fields)
                 summarizer_snippets = []
                 for snippet in snippets:
-                    summarizer_snippets.append({
+                    summarizer_snippet = {
                         "node_id": snippet.get("node_id", "unknown"),
                         "code": snippet.get("code", snippet.get("snippet", ""))
-                    })
+                    }
+                    # Pass the preview computed at index time so the summarizer can skip re-splitting
+                    if snippet.get("code_preview"):
+                        summarizer_snippet["code_preview"] = snippet["code_preview"]
+                    summarizer_snippets.append(summarizer_snippet)
                 
                 summarizer_data = {
                     "question": request.query,
@@ -779,27 +782,25 @@ def _find_steiner_tree_path(nodes: List[str]) -> tuple:
         pairwise_paths = {}
         path_costs = {}
         
+        # One BFS per terminal yields its paths to every other terminal,
+        # instead of a separate search for each pair and direction
+        reachable = {}
+        for node in nodes:
+            try:
+                reachable[node] = nx.single_source_shortest_path(graph, node)
+            except Exception as e:
+                print(f"⚠️ Error finding paths from {node}: {e}")
+                reachable[node] = {}
+        
         for i, source in enumerate(nodes):
             for j, target in enumerate(nodes[i+1:], i+1):
                 try:
                     # Try both directions
-                    path = None
-                    cost = float('inf')
-                    
-                    try:
-                        path = nx.shortest_path(graph, source, target)
-                        cost = len(path) - 1  # Edge count
-                    except nx.NetworkXNoPath:
-                        try:
-                            path = nx.shortest_path(graph, target, source)
-                            cost = len(path) - 1
-                        except nx.NetworkXNoPath:
-                            continue
-                    
-                    if path and cost < float('inf'):
+                    path = reachable[source].get(target) or reachable[target].get(source)
+                    if path:
                         key = (source, target)
                         pairwise_paths[key] = path
-                        path_costs[key] = cost
+                        path_costs[key] = len(path) - 1  # Edge count
                         
                 except Exception as e:
                     print(f"⚠️ Error finding path {source} -> {target}: {e}")
@@ -833,6 +834,7 @@ def _find_steiner_tree_path(nodes: List[str]) -> tuple:
         # Step 3: Extract all nodes and edges from MST paths
         all_path_nodes = set()
         all_edges = []
+        seen_edges = set()
         
         for source, target, data in mst.edges(data=True):
             path = data['path']
@@ -845,7 +847,8 @@ def _find_steiner_tree_path(nodes: List[str]) -> tuple:
                 
                 # Avoid duplicate edges
                 edge_key = (src, tgt)
-                if not any(e['source'] == src and e['target'] == tgt for e in all_edges):
+                if edge_key not in seen_edges:
+                    seen_edges.add(edge_key)
                     all_edges.append({
                         "source": src,
                         "target": tgt,
@@ -859,8 +862,9 @@ def _find_steiner_tree_path(nodes: List[str]) -> tuple:
                 ordered_path.append(node)
         
         # Add intermediate nodes
+        ordered_set = set(ordered_path)
         for node in all_path_nodes:
-            if node not in ordered_path:
+            if node not in ordered_set:
                 ordered_path.append(node)
         
         print(f"✅ Steiner tree: {len(ordered_path)} nodes, {len(all_edges)} edges")
@@ -971,7 +975,7 @@ def _generate_fallback_summary(snippets: List[Dict], question: str) -> Dict:
         "node_refs": [
             {
                 "node_id": snippet.get('node_id', ''),
-                "excerpt_line": snippet.get('code', '').split('\n')[0][:50] + "..."
+                "excerpt_line": snippet.get('code', '').split('\n', 1)[0][:50] + "..."
             }
             for snippet in snippets[:3]
         ]
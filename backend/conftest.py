@@ -0,0 +1,15 @@
+"""
+Shared pytest fixtures for the RepoCanvas Backend tests
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Single TestClient for the whole session so the lifespan startup runs once"""
+    with TestClient(app) as test_client:
+        yield test_client
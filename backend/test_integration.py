@@ -10,10 +10,7 @@ import time
 from app import app
 from fastapi.testclient import TestClient
 
-# Create test client
-client = TestClient(app)
-
-def test_basic_endpoints():
+def test_basic_endpoints(client):
     """Test basic API endpoints"""
     print("🧪 Testing basic endpoints...")
     
@@ -36,7 +33,7 @@ def test_basic_endpoints():
     print(f"✅ Health check: {data['status']}")
     print(f"   Services: {data['services']}")
 
-def test_search_fallback():
+def test_search_fallback(client):
     """Test search with fallback when services are unavailable"""
     print("\n🧪 Testing search fallback...")
     
@@ -56,7 +53,7 @@ def test_search_fallback():
     else:
         print(f"⚠️ Search failed: {response.status_code}")
 
-def test_ask_endpoint():
+def test_ask_endpoint(client):
     """Test the integrated ask endpoint"""
     print("\n🧪 Testing integrated ask endpoint...")
     
@@ -86,9 +83,11 @@ def main():
     print("=" * 50)
     
     try:
-        test_basic_endpoints()
-        test_search_fallback()
-        test_ask_endpoint()
+        # Enter the client context once so startup (Qdrant/graph loading) runs a single time
+        with TestClient(app) as client:
+            test_basic_endpoints(client)
+            test_search_fallback(client)
+            test_ask_endpoint(client)
         
         print("\n" + "=" * 50)
         print("✅ Integration tests completed!")
@@ -1,16 +1,35 @@
+import os
+import logging
+import orjson
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict
-from service import summarize
+from service import summarize, summarize_many, summarize_stream
 from schema import SummaryResponse
 
-app = FastAPI(title="RepoCanvas AI Summarizer", version="1.0.0")
+# WARNING by default so per-request debug output costs nothing; set
+# SUMMARIZER_LOG_LEVEL=DEBUG to see request and model-response details
+logging.basicConfig(
+    level=os.getenv("SUMMARIZER_LOG_LEVEL", "WARNING").upper(),
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+app = FastAPI(
+    title="RepoCanvas AI Summarizer",
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # orjson encodes responses several times faster than stdlib json
+)
 
 # Request model for the endpoint
 class SummarizeRequest(BaseModel):
     question: str
     snippets: List[Dict[str, str]]  # Each snippet has node_id and code
 
+class BatchSummarizeRequest(BaseModel):
+    requests: List[SummarizeRequest]
+
 @app.get("/")
 def root():
     return {"message": "RepoCanvas AI Summarizer Service", "status": "running"}
@@ -22,15 +41,39 @@ def health():
 @app.post("/summarize", response_model=SummaryResponse)
 def summarize_endpoint(request: SummarizeRequest):
     try:
-        print(f"Received request: {request.question}")
-        print(f"Number of snippets: {len(request.snippets)}")
+        logger.debug("Received request: %s (%d snippets)", request.question, len(request.snippets))
         
         result = summarize(request.question, request.snippets)
         return result
         
     except Exception as e:
-        print(f"Error in summarize_endpoint: {str(e)}")
+        logger.error("Error in summarize_endpoint: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Summarization failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@app.post("/summarize/batch", response_model=List[SummaryResponse])
+async def summarize_batch_endpoint(request: BatchSummarizeRequest):
+    try:
+        logger.debug("Received batch of %d summarize requests", len(request.requests))
+        
+        return await summarize_many([(r.question, r.snippets) for r in request.requests])
+        
+    except Exception as e:
+        logger.error("Error in summarize_batch_endpoint: %s", e)
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Batch summarization failed: {str(e)}"
+        )
+
+@app.post("/summarize/stream")
+async def summarize_stream_endpoint(request: SummarizeRequest):
+    """Stream summary fields as newline-delimited JSON while the model generates them"""
+    logger.debug("Received streaming request: %s", request.question)
+    
+    async def event_lines():
+        async for event in summarize_stream(request.question, request.snippets):
+            yield orjson.dumps(event) + b"\n"
+    
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
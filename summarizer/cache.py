@@ -0,0 +1,86 @@
+import os
+import logging
+import hashlib
+import threading
+import orjson
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Default on-disk location for cached summaries
+DEFAULT_CACHE_DIR = Path(os.getenv("REPOCANVAS_CACHE_DIR", Path.home() / ".cache" / "repocanvas")) / "summaries"
+
+def make_cache_key(question: str, formatted_snippets: str, model: str, temperature: float) -> str:
+    """Hash everything that determines the model output into a stable key."""
+    payload = orjson.dumps(
+        {"q": question, "s": formatted_snippets, "m": model, "t": temperature},
+        option=orjson.OPT_SORT_KEYS
+    )
+    return hashlib.blake2b(payload, digest_size=20).hexdigest()
+
+class SummaryCache:
+    """
+    Exact-match cache for summary responses.
+
+    Keeps the most recently used entries in memory (LRU, bounded by
+    max_entries) and persists every entry as a small JSON file so repeated
+    questions survive a restart. The in-memory LRU is shared by the
+    threadpool serving synchronous requests, so it is guarded by a lock.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR, max_entries: int = 1024):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached summary data for key, or None on a miss."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                data = orjson.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+        self._remember(key, data)
+        return data
+
+    def set(self, key: str, data: Dict[str, Any]) -> None:
+        """Store summary data in memory and on disk."""
+        self._remember(key, data)
+
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path(key).with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(data))
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning("⚠️ Failed to persist cached summary: %s", e)
+
+    def _remember(self, key: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop the in-memory entries (on-disk entries are kept)."""
+        with self._lock:
+            self._entries.clear()
@@ -29,4 +29,19 @@ Rules:
 - Focus on code flow and dependencies
 - Mention external APIs, databases, or services used
 - Suggest logical next investigation points for developers
-"""
\ No newline at end of file
+"""
+
+# USER_PROMPT split once around its placeholders (with the doubled braces
+# unescaped) so each request is a plain join instead of a str.format() pass
+# over the whole template. The static text stays byte-identical across calls.
+def _unescape(text):
+    return text.replace("{{", "{").replace("}}", "}")
+
+_head, _, _rest = USER_PROMPT.partition("{question}")
+_middle, _, _tail = _rest.partition("{snippets}")
+USER_PROMPT_PARTS = (_unescape(_head), _unescape(_middle), _unescape(_tail))
+
+def build_user_prompt(question: str, snippets: str) -> str:
+    """Equivalent to USER_PROMPT.format(question=..., snippets=...)"""
+    head, middle, tail = USER_PROMPT_PARTS
+    return "".join((head, question, middle, snippets, tail))
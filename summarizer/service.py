@@ -1,62 +1,197 @@
 import os
-import json
-from openai import OpenAI
-from dotenv import load_dotenv
-from prompts import SYSTEM_PROMPT, USER_PROMPT
+import re
+import asyncio
+import logging
+import hashlib
+import orjson
+from typing import List, Tuple, Dict, Any, AsyncIterator
+from functools import lru_cache
+from types import MappingProxyType
+from pydantic import TypeAdapter, ValidationError
+from prompts import SYSTEM_PROMPT, build_user_prompt
 from schema import SummaryResponse
+from cache import SummaryCache, make_cache_key
 
-# Load .env from current directory (summarizer/)
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-# Debug: Print if API key is loaded
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    print("ERROR: OPENAI_API_KEY not found in environment variables")
-    print("Make sure you have a .env file with OPENAI_API_KEY=your_key")
-else:
-    print(f"✅ API key loaded successfully (starts with: {api_key[:10]}...)")
+# openai and dotenv are imported on first use, so importing this module for
+# local_fallback_summary / extract_function_info stays cheap
 
-client = OpenAI(api_key=api_key)
+@lru_cache(maxsize=1)
+def _bootstrap_env():
+    """Load .env from current directory (summarizer/) once and return the API key"""
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    # Debug: Print if API key is loaded
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        logger.error("OPENAI_API_KEY not found in environment variables")
+        logger.error("Make sure you have a .env file with OPENAI_API_KEY=your_key")
+    else:
+        logger.info("✅ API key loaded successfully (starts with: %s...)", api_key[:10])
+    return api_key
+
+# Connection pool shared by all requests of a client; keep-alive reuse avoids a
+# TCP + TLS handshake per summary, and HTTP/2 multiplexes concurrent requests
+HTTP_TIMEOUT = 30.0
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE = 32
+
+def _http_client_kwargs():
+    import httpx
+    from importlib.util import find_spec
+    return {
+        "http2": find_spec("h2") is not None,  # HTTP/2 needs the optional h2 package (httpx[http2])
+        "limits": httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE),
+        "timeout": HTTP_TIMEOUT,
+    }
+
+@lru_cache(maxsize=1)
+def _get_client():
+    import httpx
+    from openai import OpenAI
+    return OpenAI(api_key=_bootstrap_env(), http_client=httpx.Client(**_http_client_kwargs()))
+
+@lru_cache(maxsize=1)
+def _get_async_client():
+    import httpx
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=_bootstrap_env(), http_client=httpx.AsyncClient(**_http_client_kwargs()))
+
+# Cap concurrent API calls from summarize_many to stay within rate limits
+MAX_CONCURRENT_REQUESTS = int(os.getenv("SUMMARIZER_MAX_CONCURRENCY", "16"))
+_request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.1  # Lower temperature for more consistent JSON
+
+# Upper bound on distinct snippets sent to the model per request
+MAX_PROMPT_SNIPPETS = int(os.getenv("SUMMARIZER_MAX_SNIPPETS", "8"))
+
+# Identical (question, snippets) pairs are answered from here instead of the API
+summary_cache = SummaryCache(max_entries=int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "1024")))
+
+def _code_preview(snippet):
+    # Indexed snippets carry a precomputed preview; split the code only when missing
+    return snippet.get("code_preview") or "\n".join(snippet["code"].splitlines()[:12])
+
+def dedupe_snippets(snippets, max_snippets=None):
+    """
+    Drop repeated snippets before they reach the prompt.
+    
+    Search results often contain the same node twice, or different nodes with
+    identical code (overlapping chunks). Keeps the first occurrence by node_id
+    and by code hash, preserving rank order, then keeps the top max_snippets.
+    """
+    if max_snippets is None:
+        max_snippets = MAX_PROMPT_SNIPPETS
+    
+    seen_ids = set()
+    seen_code = set()
+    unique = []
+    for s in snippets:
+        code_hash = hashlib.blake2b(s.get("code", "").encode("utf-8"), digest_size=8).digest()
+        if s["node_id"] in seen_ids or code_hash in seen_code:
+            continue
+        seen_ids.add(s["node_id"])
+        seen_code.add(code_hash)
+        unique.append(s)
+        if len(unique) >= max_snippets:
+            break
+    return unique
 
 def format_snippets(snippets):
-    formatted = []
-    for i, s in enumerate(snippets, 1):
-        code_preview = "\n".join(s["code"].splitlines()[:12])
-        formatted.append(f"{i}) {s['node_id']}:\n{code_preview}")
-    return "\n\n".join(formatted)
+    return "\n\n".join(
+        f"{i}) {s['node_id']}:\n{_code_preview(s)}" for i, s in enumerate(snippets, 1)
+    )
+
+# First function definition in a snippet
+FUNC_RE = re.compile(r'^[ \t]*(?:async[ \t]+)?def[ \t]+(?P<name>\w+)', re.MULTILINE)
+
+# Keyword hints for the fallback summary, matched case-insensitively anywhere
+# in the code (substring match, like the original `in` checks)
+KEYWORD_GROUPS = {
+    'db': ('database', 'find_user', 'query'),
+    'val': ('validate', 'check', 'verify'),
+    'pw': ('password',),
+    'hash': ('hash',),
+    'gen': ('create', 'generate'),
+    'tok': ('token', 'session'),
+    'api': ('api', 'request'),
+    'ret': ('return',),
+}
+
+# Operation label -> keyword groups that must all be present, in report order
+OPERATION_RULES = (
+    ("database lookup", frozenset({'db'})),
+    ("validation", frozenset({'val'})),
+    ("password verification", frozenset({'pw', 'hash'})),
+    ("creation/generation", frozenset({'gen'})),
+    ("token/session handling", frozenset({'tok'})),
+    ("API call", frozenset({'api'})),
+)
+
+# One alternation over every keyword. The lookahead makes every position a
+# candidate so overlapping keywords are all seen in one pass over the snippet.
+OPS_RE = re.compile(
+    '(?=' + '|'.join(
+        f"(?P<{group}>{'|'.join(map(re.escape, words))})"
+        for group, words in KEYWORD_GROUPS.items()
+    ) + ')',
+    re.IGNORECASE
+)
 
 def extract_function_info(code):
     """Extract basic info from code for fallback summary"""
-    lines = code.strip().split('\n')
-    function_name = "unknown"
-    
-    # Find function name
-    for line in lines:
-        if line.strip().startswith('def '):
-            function_name = line.split('def ')[1].split('(')[0]
-            break
+    match = FUNC_RE.search(code)
+    function_name = match.group('name') if match else "unknown"
     
     # Look for key operations with more specific analysis
-    operations = []
-    code_lower = code.lower()
-    
-    if 'database' in code_lower or 'find_user' in code_lower or 'query' in code_lower:
-        operations.append("database lookup")
-    if 'validate' in code_lower or 'check' in code_lower or 'verify' in code_lower:
-        operations.append("validation")
-    if 'password' in code_lower and 'hash' in code_lower:
-        operations.append("password verification")
-    if 'create' in code_lower or 'generate' in code_lower:
-        operations.append("creation/generation")
-    if 'token' in code_lower or 'session' in code_lower:
-        operations.append("token/session handling")
-    if 'api' in code_lower or 'request' in code_lower:
-        operations.append("API call")
-    if 'return' in code_lower and operations:
+    found = {m.lastgroup for m in OPS_RE.finditer(code)}
+    
+    operations = [label for label, groups in OPERATION_RULES if groups <= found]
+    if 'ret' in found and operations:
         operations.append("return result")
     
     return function_name, operations
 
+# Static text for local_fallback_summary, built once at import
+_AUTH_KEYWORDS = ('auth', 'login', 'credential')
+_AUTH_NEXT_STEP_KEYWORDS = ('auth', 'login')
+_PAYMENT_KEYWORDS = ('payment', 'charge')
+
+_OPERATION_STEPS = MappingProxyType({
+    "database lookup": "Queries database for user/data",
+    "validation": "Validates input parameters", 
+    "password verification": "Verifies password credentials",
+    "creation/generation": "Creates or generates required objects",
+    "token/session handling": "Manages authentication tokens/sessions",
+    "API call": "Makes external service calls",
+    "return result": "Returns processed result"
+})
+
+_DEFAULT_STEPS = ("Processes input data", "Performs business logic", "Returns result")
+
+_AUTH_NEXT_STEPS = (
+    "Add input validation and error handling",
+    "Consider implementing rate limiting for failed attempts", 
+    "Add logging for security monitoring",
+    "Test with various user scenarios"
+)
+_PAYMENT_NEXT_STEPS = (
+    "Add transaction logging and audit trail",
+    "Implement proper error handling for failed payments",
+    "Add security measures for sensitive data",
+    "Test with different payment scenarios"
+)
+_DEFAULT_NEXT_STEPS = (
+    "Add comprehensive error handling",
+    "Implement proper logging",
+    "Add unit tests for edge cases",
+    "Review security implications"
+)
+
 def local_fallback_summary(question: str, snippets: list) -> SummaryResponse:
     """Generate summary without external API calls"""
     if not snippets:
@@ -74,55 +209,27 @@ def local_fallback_summary(question: str, snippets: list) -> SummaryResponse:
     func_name, operations = extract_function_info(snippet['code'])
     
     # Generate context-aware summary
-    if 'auth' in question.lower() or 'login' in question.lower() or 'credential' in question.lower():
+    question_lower = question.lower()
+    if any(k in question_lower for k in _AUTH_KEYWORDS):
         one_liner = f"Authentication function '{func_name}' verifies user credentials and manages access"
-    elif 'payment' in question.lower() or 'charge' in question.lower():
+    elif any(k in question_lower for k in _PAYMENT_KEYWORDS):
         one_liner = f"Payment processing function '{func_name}' handles transaction processing"
     else:
-        one_liner = f"Function '{func_name}' processes {question.lower().replace('how does ', '').replace('?', '')}"
+        one_liner = f"Function '{func_name}' processes {question_lower.replace('how does ', '').replace('?', '')}"
     
     # Generate steps based on detected operations
-    steps = []
-    operation_map = {
-        "database lookup": "Queries database for user/data",
-        "validation": "Validates input parameters", 
-        "password verification": "Verifies password credentials",
-        "creation/generation": "Creates or generates required objects",
-        "token/session handling": "Manages authentication tokens/sessions",
-        "API call": "Makes external service calls",
-        "return result": "Returns processed result"
-    }
-    
-    for op in operations:
-        if op in operation_map:
-            steps.append(operation_map[op])
+    steps = [_OPERATION_STEPS[op] for op in operations if op in _OPERATION_STEPS]
     
     if not steps:
-        steps = ["Processes input data", "Performs business logic", "Returns result"]
+        steps = list(_DEFAULT_STEPS)
     
     # Generate contextual next steps
-    next_steps = []
-    if 'auth' in question.lower() or 'login' in question.lower():
-        next_steps = [
-            "Add input validation and error handling",
-            "Consider implementing rate limiting for failed attempts", 
-            "Add logging for security monitoring",
-            "Test with various user scenarios"
-        ]
-    elif 'payment' in question.lower():
-        next_steps = [
-            "Add transaction logging and audit trail",
-            "Implement proper error handling for failed payments",
-            "Add security measures for sensitive data",
-            "Test with different payment scenarios"
-        ]
+    if any(k in question_lower for k in _AUTH_NEXT_STEP_KEYWORDS):
+        next_steps = list(_AUTH_NEXT_STEPS)
+    elif 'payment' in question_lower:
+        next_steps = list(_PAYMENT_NEXT_STEPS)
     else:
-        next_steps = [
-            "Add comprehensive error handling",
-            "Implement proper logging",
-            "Add unit tests for edge cases",
-            "Review security implications"
-        ]
+        next_steps = list(_DEFAULT_NEXT_STEPS)
     
     return SummaryResponse(
         one_liner=one_liner,
@@ -139,51 +246,249 @@ def local_fallback_summary(question: str, snippets: list) -> SummaryResponse:
         }]
     )
 
+def _build_messages(prompt: str) -> list:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def _parse_summary(content: str, cache_key: str, question: str, snippets: list) -> SummaryResponse:
+    """Parse a raw model response into a SummaryResponse, falling back locally on bad JSON"""
+    # Log the raw response for debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("✅ Raw AI response received: %s...", content[:100])
+    
+    # Try to clean up common JSON issues
+    content = content.strip()
+    if content.startswith('```json'):
+        content = content[7:]
+    if content.endswith('```'):
+        content = content[:-3]
+    content = content.strip()
+    
+    try:
+        # Parse and validate the JSON response in one pass (pydantic-core)
+        result = SummaryResponse.model_validate_json(content)
+        logger.debug("✅ JSON parsed successfully, returning AI response")
+        # Only successful AI responses are cached; fallbacks are retried next time
+        summary_cache.set(cache_key, result.model_dump())
+        return result
+        
+    except ValidationError as e:
+        logger.warning("❌ JSON parsing error, falling back to local summary: %s", e)
+        logger.debug("❌ Problematic content: '%s'", content)
+        return local_fallback_summary(question, snippets)
+
+def _api_error_fallback(e: Exception, question: str, snippets: list) -> SummaryResponse:
+    logger.warning("❌ API call error (%s), falling back to local summary: %s", type(e).__name__, e)
+    return local_fallback_summary(question, snippets)
+
 def summarize(question: str, snippets: list) -> SummaryResponse:
     # Check if API key is available
-    if not api_key:
-        print("❌ No API key available, using fallback")
+    if not _bootstrap_env():
+        logger.debug("❌ No API key available, using fallback")
         return local_fallback_summary(question, snippets)
     
-    prompt = USER_PROMPT.format(question=question, snippets=format_snippets(snippets))
-    print(f"🔍 Making API call to GPT-4o...")
+    formatted_snippets = format_snippets(dedupe_snippets(snippets))
+    cache_key = make_cache_key(question, formatted_snippets, MODEL, TEMPERATURE)
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("⚡ Returning cached summary")
+        return SummaryResponse(**cached)
+    
+    prompt = build_user_prompt(question, formatted_snippets)
+    logger.debug("🔍 Making API call to %s...", MODEL)
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": prompt}
-            ],
+        response = _get_client().chat.completions.create(
+            model=MODEL,
+            messages=_build_messages(prompt),
             max_tokens=500,
-            temperature=0.1  # Lower temperature for more consistent JSON
+            temperature=TEMPERATURE
         )
         content = response.choices[0].message.content.strip()
+        return _parse_summary(content, cache_key, question, snippets)
         
-        # Log the raw response for debugging
-        print(f"✅ Raw AI response received: {content[:100]}...")
-        
-        # Try to clean up common JSON issues
-        content = content.strip()
-        if content.startswith('```json'):
-            content = content[7:]
-        if content.endswith('```'):
-            content = content[:-3]
-        content = content.strip()
-        
-        # Parse the JSON response
-        summary_data = json.loads(content)
-        print(f"✅ JSON parsed successfully, returning AI response")
-        return SummaryResponse(**summary_data)
-        
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON parsing error: {e}")
-        print(f"❌ Problematic content: '{content}'")
-        print("🔄 Falling back to local summary...")
+    except Exception as e:
+        return _api_error_fallback(e, question, snippets)
+
+async def summarize_async(question: str, snippets: list) -> SummaryResponse:
+    """Async variant of summarize() using the shared AsyncOpenAI client"""
+    if not _bootstrap_env():
+        logger.debug("❌ No API key available, using fallback")
         return local_fallback_summary(question, snippets)
+    
+    formatted_snippets = format_snippets(dedupe_snippets(snippets))
+    cache_key = make_cache_key(question, formatted_snippets, MODEL, TEMPERATURE)
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("⚡ Returning cached summary")
+        return SummaryResponse(**cached)
+    
+    prompt = build_user_prompt(question, formatted_snippets)
+    
+    try:
+        async with _request_semaphore:
+            response = await _get_async_client().chat.completions.create(
+                model=MODEL,
+                messages=_build_messages(prompt),
+                max_tokens=500,
+                temperature=TEMPERATURE
+            )
+        content = response.choices[0].message.content.strip()
+        return _parse_summary(content, cache_key, question, snippets)
         
     except Exception as e:
-        print(f"❌ API call error: {e}")
-        print(f"❌ Error type: {type(e).__name__}")
-        print("🔄 Falling back to local summary...")
-        return local_fallback_summary(question, snippets)
\ No newline at end of file
+        return _api_error_fallback(e, question, snippets)
+
+async def summarize_many(pairs: List[Tuple[str, list]]) -> List[SummaryResponse]:
+    """
+    Summarize several (question, snippets) pairs concurrently.
+    
+    Requests run in parallel (bounded by MAX_CONCURRENT_REQUESTS), so N
+    summaries take roughly as long as the slowest one instead of the sum.
+    Results are returned in input order.
+    """
+    logger.debug("🔍 Summarizing %d requests concurrently...", len(pairs))
+    return await asyncio.gather(*(summarize_async(q, s) for q, s in pairs))
+
+class _StreamingFieldParser:
+    """
+    Incrementally parse a streamed JSON object, yielding each top-level
+    field as soon as its value is complete.
+    
+    Tracks string/nesting state character by character, so a field is only
+    decoded once the comma or closing brace after it has arrived. Anything
+    before the opening brace (e.g. a ```json fence) is ignored.
+    """
+    
+    def __init__(self):
+        self.started = False
+        self.done = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.segment = []
+    
+    def feed(self, piece: str) -> Dict[str, Any]:
+        completed = {}
+        for ch in piece:
+            if self.done:
+                break
+            if not self.started:
+                if ch == '{':
+                    self.started = True
+                    self.depth = 1
+                continue
+            
+            if self.in_string:
+                self.segment.append(ch)
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+            
+            if ch == '"':
+                self.in_string = True
+            elif ch in '{[':
+                self.depth += 1
+            elif ch in '}]':
+                self.depth -= 1
+            
+            if (self.depth == 1 and ch == ',') or self.depth == 0:
+                field_text = "".join(self.segment).strip()
+                self.segment = []
+                if field_text:
+                    try:
+                        completed.update(orjson.loads("{" + field_text + "}"))
+                    except orjson.JSONDecodeError:
+                        pass
+                self.done = self.depth == 0
+                continue
+            
+            self.segment.append(ch)
+        return completed
+
+# Streamed fields are validated one by one so only schema-valid values reach clients
+_FIELD_ADAPTERS = MappingProxyType({
+    name: TypeAdapter(field.annotation) for name, field in SummaryResponse.model_fields.items()
+})
+
+async def summarize_stream(question: str, snippets: list) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a summary as it is generated.
+    
+    Yields {"event": "field", "name": ..., "value": ...} for each top-level
+    field as soon as the model finishes emitting it, then a final
+    {"event": "summary", "data": {...}} with the validated full response.
+    Cache hits, missing API keys and failures yield the complete summary
+    (falling back to the blocking path if the stream breaks mid-way).
+    Each field is sent at most once: when the stream breaks or fails
+    validation, only the fields not streamed yet are filled in from the
+    fallback, and the final summary keeps the values already sent.
+    """
+    streamed = {}
+    
+    async def _emit_whole(summary: SummaryResponse):
+        data = {**summary.model_dump(), **streamed}
+        for name, value in data.items():
+            if name not in streamed:
+                yield {"event": "field", "name": name, "value": value}
+        yield {"event": "summary", "data": data}
+    
+    if not _bootstrap_env():
+        logger.debug("❌ No API key available, using fallback")
+        async for event in _emit_whole(local_fallback_summary(question, snippets)):
+            yield event
+        return
+    
+    formatted_snippets = format_snippets(dedupe_snippets(snippets))
+    cache_key = make_cache_key(question, formatted_snippets, MODEL, TEMPERATURE)
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("⚡ Returning cached summary")
+        async for event in _emit_whole(SummaryResponse(**cached)):
+            yield event
+        return
+    
+    prompt = build_user_prompt(question, formatted_snippets)
+    parser = _StreamingFieldParser()
+    pieces = []
+    
+    try:
+        async with _request_semaphore:
+            stream = await _get_async_client().chat.completions.create(
+                model=MODEL,
+                messages=_build_messages(prompt),
+                max_tokens=500,
+                temperature=TEMPERATURE,
+                stream=True
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content
+                if not piece:
+                    continue
+                pieces.append(piece)
+                for name, value in parser.feed(piece).items():
+                    adapter = _FIELD_ADAPTERS.get(name)
+                    if adapter is None or name in streamed:
+                        continue
+                    try:
+                        streamed[name] = adapter.validate_python(value)
+                    except ValidationError:
+                        continue
+                    yield {"event": "field", "name": name, "value": streamed[name]}
+    except Exception as e:
+        logger.warning("❌ Streaming error, falling back to blocking call: %s", e)
+        async for event in _emit_whole(await summarize_async(question, snippets)):
+            yield event
+        return
+    
+    summary = _parse_summary("".join(pieces).strip(), cache_key, question, snippets)
+    async for event in _emit_whole(summary):
+        yield event
@@ -5,4 +5,4 @@ snippets = [
 ]
 
 resp = summarize("Explain this function", snippets)
-print(resp.json(indent=2))
+print(resp.model_dump_json(indent=2))
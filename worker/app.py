@@ -1,20 +1,58 @@
 """
 Worker Service - FastAPI application to expose repository parsing and indexing functionality.
 This service provides HTTP endpoints for the backend to call for repository analysis.
+
+Performance notes:
+    The request hot path (/search, /analyze) is Qdrant network I/O, payload
+    deserialization, dict assembly and JSON re-serialization. It is bound by
+    round trips and memory traffic, not arithmetic, so SIMD, GPU or reduced
+    precision tricks do not pay off here. What does: fewer round trips
+    (batched retrieve, cached metadata and payloads), a faster stack (orjson,
+    uvloop), streaming responses and precomputed constants. Embedding and
+    parsing are the compute-bound parts and run off the event loop.
+
+    Measure before optimizing further. With WORKER_PROFILE=1 every /analyze
+    call is profiled with cProfile into WORKER_PROFILE_DIR (inspect with
+    snakeviz or flameprof). For a whole-process flamegraph run the worker
+    under py-spy: py-spy record -o worker.svg -- python app.py
 """
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, HttpUrl, field_validator
-from typing import Optional, Dict, List, Any, Union
+from typing import Optional, Dict, List, Any, Mapping, Union
+from types import MappingProxyType
 import os
 import logging
 import asyncio
+import hashlib
+import multiprocessing
+import threading
 import time
+import orjson
 from pathlib import Path
 import tempfile
 import shutil
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache, partial
 from datetime import datetime
+import httpx
+import numpy as np
+
+try:
+    import ijson
+except ImportError:  # optional; graph.json is then loaded in one go with orjson
+    ijson = None
+
+try:
+    import msgpack
+except ImportError:  # optional; responses are then always JSON
+    msgpack = None
 
 # Import our parsing and indexing modules
 from parse_repo import (
@@ -24,16 +62,34 @@ from parse_repo import (
     build_repository_graph,
     build_repository_with_documents,
     generate_embedding_documents,
-    make_document_for_node
+    make_document_for_node,
+    save_documents_sidecar,
+    load_documents_sidecar,
+    persist_qdrant_mapping,
+    load_qdrant_mapping
 )
 from parser.utils import clone_repo
-from indexer.embedder import embed_documents, embed_documents_simple, MODEL_NAME, get_embedding_dimension
+from indexer.embedder import (
+    embed_documents,
+    embed_documents_sorted,
+    encode_texts,
+    preload_model,
+    MODEL_NAME,
+    get_embedding_dimension
+)
+from indexer.embedder_cache import embed_with_cache
+from job_store import JobStore
+from indexer.query_batcher import QueryBatcher
+from qdrant_client.models import (
+    SearchParams, QuantizationSearchParams, Filter, FieldCondition, MatchAny
+)
 from indexer.qdrant_client import (
     QdrantClient, 
     create_or_recreate_collection, 
-    upsert_embeddings, 
+    upload_embeddings, 
     create_node_payloads,
-    upsert_graph_data,
+    upsert_node_batch,
+    upsert_edge_points,
     get_collection_info
 )
 
@@ -41,11 +97,154 @@ from indexer.qdrant_client import (
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Bulk indexing requests can take well beyond the client's 5s default
+QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", "60"))
+
+# Collections keep int8-quantized vectors in RAM; searches rescore the
+# oversampled candidates against the original vectors
+QDRANT_SCALAR_QUANTIZATION = os.getenv("QDRANT_SCALAR_QUANTIZATION", "true").lower() == "true"
+QDRANT_HNSW_CONFIG = {"hnsw_m": 16, "hnsw_ef_construct": 128}
+SEARCH_PARAMS = SearchParams(
+    quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+) if QDRANT_SCALAR_QUANTIZATION else None
+
+# gRPC needs Qdrant's 6334 port exposed; HTTP works with the default compose setup
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+
+# Connections kept open per client for concurrent searches and uploads
+QDRANT_POOL_SIZE = int(os.getenv("QDRANT_POOL_SIZE", "100"))
+_qdrant_client_lock = threading.Lock()
+
+@lru_cache(maxsize=8)
+def _qdrant_client_for(url: str) -> QdrantClient:
+    logger.info(f"Connecting to Qdrant at {url}")
+    return QdrantClient(
+        url=url,
+        timeout=QDRANT_TIMEOUT,
+        prefer_grpc=QDRANT_PREFER_GRPC,
+        grpc_port=QDRANT_GRPC_PORT,
+        # Forwarded to the underlying httpx client (REST transport)
+        limits=httpx.Limits(max_connections=QDRANT_POOL_SIZE, max_keepalive_connections=QDRANT_POOL_SIZE)
+    )
+
+def _get_qdrant_client(url: Optional[str] = None) -> QdrantClient:
+    """
+    Return the process-wide Qdrant client for a URL (default: QDRANT_URL).
+    
+    Clients keep their connection pool, so reusing one avoids a new
+    connection setup on every request and background job.
+    """
+    url = url or os.getenv("QDRANT_URL", "http://localhost:6333")
+    # Serialize first construction so concurrent callers share one client
+    with _qdrant_client_lock:
+        return _qdrant_client_for(url)
+
+# Collection metadata changes only on (re)index; serve it from memory briefly
+COLLECTION_INFO_TTL = float(os.getenv("COLLECTION_INFO_TTL", "30"))
+_collection_info_cache: Dict[tuple, tuple] = {}
+
+async def _get_collection_info_cached(client: QdrantClient, collection_name: str, qdrant_url: Optional[str] = None) -> Optional[Dict]:
+    """get_collection_info with a COLLECTION_INFO_TTL-second cache of existing collections."""
+    key = (qdrant_url or os.getenv("QDRANT_URL", "http://localhost:6333"), collection_name)
+    cached = _collection_info_cache.get(key)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    
+    info = await asyncio.to_thread(get_collection_info, client, collection_name)
+    # Missing collections are not cached so a fresh index shows up immediately
+    if info and info.get('exists', False):
+        _collection_info_cache[key] = (info, time.monotonic() + COLLECTION_INFO_TTL)
+    return info
+
+def _invalidate_collection_info(collection_name: str) -> None:
+    for key in [key for key in _collection_info_cache if key[1] == collection_name]:
+        del _collection_info_cache[key]
+
+@lru_cache(maxsize=1)
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for repository parsing.
+    
+    Parsing is CPU-bound Python; running it in separate processes keeps it
+    off the GIL shared with the event loop and lets concurrent parse jobs
+    use several cores. Jobs submitted here parse with max_workers=1 so each
+    one stays a single process instead of starting a nested pool.
+    
+    Workers come from a forkserver: by the time the first parse runs, this
+    process has torch, the query batcher and to_thread workers running, and
+    forking a multi-threaded process can deadlock the child.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max(1, (os.cpu_count() or 2) // 2),
+        mp_context=multiprocessing.get_context("forkserver")
+    )
+
+def _remove_dir_in_background(path: str) -> None:
+    """Delete a directory tree on the default thread pool without awaiting it."""
+    asyncio.get_running_loop().run_in_executor(None, partial(shutil.rmtree, path, ignore_errors=True))
+
+def _encode(texts: List[str], model_name: str = MODEL_NAME):
+    """Encode query texts with the process-wide cached embedding model"""
+    return encode_texts(texts, model_name=model_name, normalize=True)
+
+# Concurrent /search queries arriving within a few ms share one encoder call
+query_batcher = QueryBatcher(
+    _encode,
+    max_batch=int(os.getenv("QUERY_BATCH_MAX_SIZE", "64")),
+    max_wait_ms=float(os.getenv("QUERY_BATCH_MAX_WAIT_MS", "8"))
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: load the embedding model now so the first /search doesn't pay for it
+    if os.getenv("WORKER_PRELOAD_MODEL", "true").lower() == "true":
+        try:
+            logger.info(f"Preloading embedding model: {MODEL_NAME}")
+            await asyncio.to_thread(preload_model, MODEL_NAME)
+        except Exception as e:
+            logger.warning(f"Failed to preload embedding model: {e}")
+    try:
+        # Open the default Qdrant connection before the first request needs it
+        await asyncio.to_thread(lambda: _get_qdrant_client().get_collections())
+    except Exception as e:
+        logger.warning(f"Qdrant not reachable at startup: {e}")
+    query_batcher.start()
+    yield
+    # Shutdown
+    await query_batcher.stop()
+    await job_store.close()
+    if _get_parse_pool.cache_info().currsize:
+        _get_parse_pool().shutdown(wait=False, cancel_futures=True)
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+# Set per request by the content-negotiation middleware below
+_wants_msgpack: ContextVar[bool] = ContextVar("wants_msgpack", default=False)
+
+class NegotiatedResponse(ORJSONResponse):
+    """
+    orjson response that switches to msgpack for clients sending
+    Accept: application/msgpack (e.g. the backend's WorkerServiceClient).
+    Browsers and other clients keep getting JSON.
+    """
+    
+    def __init__(self, content: Any = None, *args, **kwargs):
+        if msgpack is not None and _wants_msgpack.get():
+            self.media_type = MSGPACK_MEDIA_TYPE
+        super().__init__(content, *args, **kwargs)
+    
+    def render(self, content: Any) -> bytes:
+        if self.media_type == MSGPACK_MEDIA_TYPE:
+            return msgpack.packb(content, use_bin_type=True, default=str)
+        return super().render(content)
+
 # Create FastAPI app
 app = FastAPI(
     title="RepoCanvas Worker Service",
     description="Repository parsing and indexing service for RepoCanvas",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=NegotiatedResponse
 )
 
 # CORS middleware
@@ -57,9 +256,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global variables for tracking jobs
-active_jobs = {}
-job_results = {}
+@app.middleware("http")
+async def negotiate_msgpack(request, call_next):
+    token = _wants_msgpack.set(MSGPACK_MEDIA_TYPE in request.headers.get("accept", ""))
+    try:
+        return await call_next(request)
+    finally:
+        _wants_msgpack.reset(token)
+
+# Opt-in per-request profiling of /analyze (see module docstring)
+WORKER_PROFILE = os.getenv("WORKER_PROFILE", "0") == "1"
+WORKER_PROFILE_DIR = os.getenv("WORKER_PROFILE_DIR", os.path.join("data", "profiles"))
+
+if WORKER_PROFILE:
+    import cProfile
+    
+    @app.middleware("http")
+    async def profile_analyze(request, call_next):
+        if not request.url.path.startswith("/analyze"):
+            return await call_next(request)
+        # Captures the event-loop thread; work in asyncio.to_thread shows as waits
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return await call_next(request)
+        finally:
+            profiler.disable()
+            os.makedirs(WORKER_PROFILE_DIR, exist_ok=True)
+            profile_path = os.path.join(WORKER_PROFILE_DIR, f"analyze-{time.time_ns()}.prof")
+            profiler.dump_stats(profile_path)
+            logger.info(f"Wrote /analyze profile to {profile_path}")
+
+# Job status and results (in-memory, or shared through Redis when REDIS_URL is set)
+job_store = JobStore.from_env()
 
 # Pydantic models for request validation
 class ParseRequest(BaseModel):
@@ -100,12 +329,11 @@ async def search_repository(request: SearchRequest):
     """
     try:
         # Connect to Qdrant
-        qdrant_client_url = request.qdrant_url or os.getenv("QDRANT_URL", "http://localhost:6333")
-        client = QdrantClient(url=qdrant_client_url)
+        client = _get_qdrant_client(request.qdrant_url)
         
         # Check if collection exists and has indexed vectors
         try:
-            collection_info = get_collection_info(client, request.collection_name)
+            collection_info = await _get_collection_info_cached(client, request.collection_name, request.qdrant_url)
             if not collection_info or not collection_info.get('exists', False):
                 return {
                     "success": False,
@@ -141,11 +369,10 @@ async def search_repository(request: SearchRequest):
                 "total_results": 0
             }
         
-        # Generate embedding for the query
-        from indexer.embedder import embed_documents_simple, MODEL_NAME
-        query_embedding = embed_documents_simple([request.query], model_name=MODEL_NAME)
+        # Generate embedding for the query (batched with concurrent searches)
+        query_vector = await query_batcher.encode(request.query)
         
-        if len(query_embedding) == 0:
+        if query_vector is None or len(query_vector) == 0:
             return {
                 "success": False,
                 "error": "Failed to generate query embedding",
@@ -154,12 +381,15 @@ async def search_repository(request: SearchRequest):
                 "total_results": 0
             }
         
-        # Perform vector search
-        search_results = client.search(
+        # Perform vector search (blocking HTTP call, kept off the event loop)
+        search_results = await asyncio.to_thread(
+            client.search,
             collection_name=request.collection_name,
-            query_vector=query_embedding[0].tolist(),
+            # The client accepts numpy directly; no per-element Python float boxing
+            query_vector=np.ascontiguousarray(query_vector, dtype=np.float32),
             limit=request.top_k,
-            with_payload=True
+            with_payload=True,
+            search_params=SEARCH_PARAMS
         )
         
         # Format results as expected by backend
@@ -223,7 +453,7 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "active_jobs": len(active_jobs),
+        "active_jobs": await job_store.count(),
         "environment": {
             "qdrant_url": os.getenv("QDRANT_URL", "http://localhost:6333"),
             "model_name": MODEL_NAME
@@ -256,14 +486,14 @@ async def parse_repository(request: ParseRequest, background_tasks: BackgroundTa
         )
         
         # Track the job
-        active_jobs[job_id] = {
+        await job_store.create(job_id, {
             "type": "parse",
             "status": "started",
             "start_time": datetime.now().isoformat(),
             "repo_url": request.repo_url,
             "repo_path": request.repo_path,
             "branch": request.branch
-        }
+        })
         
         return {
             "success": True,
@@ -283,14 +513,14 @@ async def _background_parse_task(job_id: str, repo_url: str, repo_path: str, bra
     start_time = time.time()
     try:
         logger.info(f"Starting parse job {job_id}")
-        active_jobs[job_id]["status"] = "parsing"
+        await job_store.update(job_id, status="parsing")
         
         # Determine the repository source
         if repo_url:
             logger.info(f"Cloning repository from {repo_url}")
             temp_dir = tempfile.mkdtemp()
             try:
-                repo_root = clone_repo(repo_url, temp_dir, branch=branch)
+                repo_root = await asyncio.to_thread(clone_repo, repo_url, temp_dir, branch=branch)
                 logger.info(f"Repository cloned to {repo_root}")
             except Exception as e:
                 raise Exception(f"Failed to clone repository: {str(e)}")
@@ -305,21 +535,39 @@ async def _background_parse_task(job_id: str, repo_url: str, repo_path: str, bra
         
         # Build the repository graph
         logger.info(f"Building repository graph for {repo_root}")
-        nodes, edges, graph = build_repository_graph(repo_root, output_path)
+        # Fresh clones never hit the cache, so only reuse graphs for local paths
+        nodes, edges, graph = await asyncio.get_running_loop().run_in_executor(
+            _get_parse_pool(), partial(build_repository_graph, repo_root, output_path, use_cache=not repo_url, max_workers=1)
+        )
         
-        # Calculate statistics
+        # Precompute the embedding documents so a later /index run reuses them
+        await asyncio.to_thread(save_documents_sidecar, output_path, nodes)
+        
+        # Calculate statistics in a single pass (node kinds are tagged at parse time)
+        files = set()
+        node_ids = set()
+        functions_found = classes_found = 0
+        for node in nodes:
+            files.add(node.get('file', ''))
+            node_ids.add(node.get('id'))
+            node_type = node.get('type')
+            if node_type == 'FUNCTION':
+                functions_found += 1
+            elif node_type == 'CLASS':
+                classes_found += 1
         stats = {
-            "files_processed": len(set(node.get('file', '') for node in nodes)),
-            "functions_found": len([n for n in nodes if 'function:' in n.get('id', '')]),
-            "classes_found": len([n for n in nodes if 'class:' in n.get('id', '')]),
+            "files_processed": len(files),
+            "functions_found": functions_found,
+            "classes_found": classes_found,
             "total_nodes": len(nodes),
             "total_edges": len(edges),
-            "graph_nodes": len(graph.nodes),
+            # Distinct node ids, as in graph.nodes, without building the id index
+            "graph_nodes": len(node_ids),
             "graph_edges": len(graph.edges)
         }
         
         # Store results
-        job_results[job_id] = {
+        await job_store.set_result(job_id, {
             "success": True,
             "job_id": job_id,
             "type": "parse",
@@ -335,30 +583,27 @@ async def _background_parse_task(job_id: str, repo_url: str, repo_path: str, bra
             "processing_time": time.time() - start_time,
             "repo_url": repo_url,
             "branch": branch
-        }
+        })
         
-        # Clean up temporary directory if we cloned
+        # Remove the temporary clone in the background; completion isn't held up by it
         if repo_url and temp_dir:
-            try:
-                shutil.rmtree(temp_dir)
-            except Exception as e:
-                logger.warning(f"Failed to clean up temp directory: {e}")
+            _remove_dir_in_background(temp_dir)
         
         # Update job status
-        active_jobs[job_id]["status"] = "completed"
+        await job_store.update(job_id, status="completed")
         logger.info(f"Parse job {job_id} completed successfully")
         
     except Exception as e:
         logger.error(f"Parse job {job_id} failed: {e}")
-        job_results[job_id] = {
+        await job_store.set_result(job_id, {
             "success": False,
             "job_id": job_id,
             "type": "parse",
             "status": "failed",
             "error": str(e),
             "completion_time": datetime.now().isoformat()
-        }
-        active_jobs[job_id]["status"] = "failed"
+        })
+        await job_store.update(job_id, status="failed")
 
 @app.post("/index")
 async def index_repository(request: IndexRequest, background_tasks: BackgroundTasks):
@@ -383,13 +628,13 @@ async def index_repository(request: IndexRequest, background_tasks: BackgroundTa
         )
         
         # Track the job
-        active_jobs[job_id] = {
+        await job_store.create(job_id, {
             "type": "index",
             "status": "started",
             "start_time": datetime.now().isoformat(),
             "collection_name": request.collection_name,
             "model_name": request.model_name
-        }
+        })
         
         return {
             "success": True,
@@ -406,12 +651,34 @@ async def index_repository(request: IndexRequest, background_tasks: BackgroundTa
         logger.error(f"Index request failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to initiate indexing: {str(e)}")
 
+def _load_nodes_and_documents(graph_path: str) -> tuple:
+    """
+    Read the nodes of a graph.json and the documents to embed for them.
+    
+    With ijson installed the node array is streamed item by item, so the
+    raw file and the whole parsed graph (including edges) are never held
+    in memory at once. Documents come from the side-car written at parse
+    time when it matches the nodes, and are only rebuilt otherwise.
+    """
+    with open(graph_path, 'rb') as f:
+        if ijson is not None:
+            nodes = list(ijson.items(f, 'nodes.item', use_float=True))
+        else:
+            nodes = orjson.loads(f.read()).get('nodes', [])
+    
+    documents = load_documents_sidecar(graph_path, nodes)
+    if documents is None:
+        documents = [make_document_for_node(node) for node in nodes]
+    else:
+        logger.info(f"Reusing precomputed documents for {len(documents)} nodes")
+    return nodes, documents
+
 async def _background_index_task(job_id: str, collection_name: str, qdrant_url: str, 
                                  model_name: str, graph_path: str, recreate_collection: bool):
     """Background task for repository indexing"""
     try:
         logger.info(f"Starting index job {job_id}")
-        active_jobs[job_id]["status"] = "loading_graph"
+        await job_store.update(job_id, status="loading_graph")
         
         # Load graph data
         if not graph_path:
@@ -420,58 +687,60 @@ async def _background_index_task(job_id: str, collection_name: str, qdrant_url:
         if not os.path.exists(graph_path):
             raise Exception(f"Graph file not found: {graph_path}")
         
-        import json
-        with open(graph_path, 'r', encoding='utf-8') as f:
-            graph_data = json.load(f)
-        
-        nodes = graph_data.get('nodes', [])
+        # Nodes are streamed and turned into documents in the same pass
+        logger.info("Loading nodes and generating semantic documents...")
+        nodes, documents = await asyncio.to_thread(_load_nodes_and_documents, graph_path)
         if not nodes:
             raise Exception("No nodes found in graph data")
         
         logger.info(f"Loaded {len(nodes)} nodes from {graph_path}")
         
-        # Generate documents for embedding
-        active_jobs[job_id]["status"] = "generating_documents"
-        logger.info("Generating semantic documents...")
-        documents = [make_document_for_node(node) for node in nodes]
-        
         # Generate embeddings
-        active_jobs[job_id]["status"] = "generating_embeddings"
+        await job_store.update(job_id, status="generating_embeddings")
         logger.info(f"Generating embeddings with model: {model_name}")
-        embeddings = embed_documents_simple(documents, model_name=model_name)
+        # Only documents whose text changed since the last run hit the model
+        embeddings = await asyncio.to_thread(
+            embed_with_cache, documents, partial(embed_documents_sorted, model_name=model_name), model_name
+        )
         
         # Connect to Qdrant
-        active_jobs[job_id]["status"] = "connecting_qdrant"
-        qdrant_client_url = qdrant_url or os.getenv("QDRANT_URL", "http://localhost:6333")
-        logger.info(f"Connecting to Qdrant at {qdrant_client_url}")
-        client = QdrantClient(url=qdrant_client_url)
+        await job_store.update(job_id, status="connecting_qdrant")
+        client = _get_qdrant_client(qdrant_url)
         
         # Create or recreate collection
-        active_jobs[job_id]["status"] = "creating_collection"
+        await job_store.update(job_id, status="creating_collection")
         if recreate_collection:
             logger.info(f"Creating/recreating collection: {collection_name}")
-            success = create_or_recreate_collection(client, collection_name, embeddings.shape[1])
+            success = await asyncio.to_thread(
+                create_or_recreate_collection, client, collection_name, embeddings.shape[1],
+                scalar_quantization=QDRANT_SCALAR_QUANTIZATION, **QDRANT_HNSW_CONFIG
+            )
             if not success:
                 raise Exception(f"Failed to create collection: {collection_name}")
         
         # Prepare payloads
-        active_jobs[job_id]["status"] = "preparing_payloads"
+        await job_store.update(job_id, status="preparing_payloads")
         logger.info("Preparing node payloads...")
         payloads = create_node_payloads(nodes)
         
         # Upsert embeddings
-        active_jobs[job_id]["status"] = "upserting_embeddings"
-        logger.info("Upserting embeddings to Qdrant...")
-        mapping = upsert_embeddings(client, collection_name, embeddings, payloads)
+        await job_store.update(job_id, status="upserting_embeddings")
+        logger.info("Uploading embeddings to Qdrant...")
+        mapping = await asyncio.to_thread(upload_embeddings, client, collection_name, embeddings, payloads)
         
         if not mapping:
             raise Exception("Failed to upsert embeddings - no mapping returned")
         
+        # Point ids let /analyze fetch snippets by key instead of a payload filter
+        await asyncio.to_thread(persist_qdrant_mapping, mapping, _qdrant_map_path(collection_name, qdrant_url))
+        _invalidate_snippet_cache(collection_name)
+        _invalidate_collection_info(collection_name)
+        
         # Get collection info
-        collection_info = get_collection_info(client, collection_name)
+        collection_info = await _get_collection_info_cached(client, collection_name, qdrant_url)
         
         # Store results
-        job_results[job_id] = {
+        await job_store.set_result(job_id, {
             "success": True,
             "job_id": job_id,
             "type": "index",
@@ -482,23 +751,23 @@ async def _background_index_task(job_id: str, collection_name: str, qdrant_url:
             "embedding_dimension": embeddings.shape[1],
             "collection_info": collection_info,
             "completion_time": datetime.now().isoformat()
-        }
+        })
         
         # Update job status
-        active_jobs[job_id]["status"] = "completed"
+        await job_store.update(job_id, status="completed")
         logger.info(f"Index job {job_id} completed successfully")
         
     except Exception as e:
         logger.error(f"Index job {job_id} failed: {e}")
-        job_results[job_id] = {
+        await job_store.set_result(job_id, {
             "success": False,
             "job_id": job_id,
             "type": "index",
             "status": "failed",
             "error": str(e),
             "completion_time": datetime.now().isoformat()
-        }
-        active_jobs[job_id]["status"] = "failed"
+        })
+        await job_store.update(job_id, status="failed")
 
 @app.post("/parse-and-index")
 async def parse_and_index_repository(request: ParseAndIndexRequest, background_tasks: BackgroundTasks):
@@ -529,7 +798,7 @@ async def parse_and_index_repository(request: ParseAndIndexRequest, background_t
         )
         
         # Track the job
-        active_jobs[job_id] = {
+        await job_store.create(job_id, {
             "type": "parse_and_index",
             "status": "started",
             "start_time": datetime.now().isoformat(),
@@ -537,7 +806,7 @@ async def parse_and_index_repository(request: ParseAndIndexRequest, background_t
             "repo_path": request.repo_path,
             "collection_name": request.collection_name,
             "model_name": request.model_name
-        }
+        })
         
         return {
             "success": True,
@@ -553,6 +822,56 @@ async def parse_and_index_repository(request: ParseAndIndexRequest, background_t
         logger.error(f"Parse and index request failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to initiate parse and index: {str(e)}")
 
+# Documents embedded and upserted per pipeline step
+PIPELINE_WINDOW = int(os.getenv("INDEX_PIPELINE_WINDOW", "512"))
+
+async def _embed_and_upsert_pipelined(client: QdrantClient, collection_name: str, nodes: List[Dict],
+                                      documents: List[str], model_name: str,
+                                      window: int = PIPELINE_WINDOW) -> Dict[str, int]:
+    """
+    Embed documents window by window while the previous window is upserted.
+    
+    The embedder and the uploader run as two tasks joined by a bounded queue,
+    so only a couple of windows of vectors are ever held in memory and the
+    model is not idle while Qdrant ingests.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+    mapping: Dict[str, int] = {}
+    embed_window = partial(embed_documents_sorted, model_name=model_name)
+    
+    async def embed_windows():
+        try:
+            for start in range(0, len(documents), window):
+                vectors = await asyncio.to_thread(
+                    embed_with_cache, documents[start:start + window], embed_window, model_name
+                )
+                await queue.put((start, vectors))
+        finally:
+            await queue.put(None)
+    
+    async def upsert_windows():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            start, vectors = item
+            mapping.update(await asyncio.to_thread(
+                upsert_node_batch, client, collection_name, nodes[start:start + window], vectors, start
+            ))
+    
+    producer = asyncio.create_task(embed_windows())
+    try:
+        await upsert_windows()
+    finally:
+        if not producer.done():
+            producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+    # Surface embedding failures that ended the stream early
+    if not producer.cancelled() and producer.exception():
+        raise producer.exception()
+    
+    return mapping
+
 async def _background_parse_and_index_task(job_id: str, repo_url: str, repo_path: str, branch: str,
                                           collection_name: str, qdrant_url: str, model_name: str,
                                           recreate_collection: bool):
@@ -561,13 +880,13 @@ async def _background_parse_and_index_task(job_id: str, repo_url: str, repo_path
         logger.info(f"Starting parse and index job {job_id}")
         
         # Phase 1: Repository setup
-        active_jobs[job_id]["status"] = "cloning_repository"
+        await job_store.update(job_id, status="cloning_repository")
         
         if repo_url:
             logger.info(f"Cloning repository from {repo_url}")
             temp_dir = tempfile.mkdtemp()
             try:
-                repo_root = clone_repo(repo_url, temp_dir, branch=branch)
+                repo_root = await asyncio.to_thread(clone_repo, repo_url, temp_dir, branch=branch)
                 logger.info(f"Repository cloned to {repo_root}")
             except Exception as e:
                 raise Exception(f"Failed to clone repository: {str(e)}")
@@ -577,44 +896,59 @@ async def _background_parse_and_index_task(job_id: str, repo_url: str, repo_path
                 raise Exception(f"Repository path does not exist: {repo_root}")
         
         # Phase 2: Parsing
-        active_jobs[job_id]["status"] = "parsing_repository"
+        await job_store.update(job_id, status="parsing_repository")
         logger.info(f"Building repository graph for {repo_root}")
         
         output_path = os.path.join(repo_root, "graph.json")
-        results = build_repository_with_documents(
+        results = await asyncio.get_running_loop().run_in_executor(_get_parse_pool(), partial(
+            build_repository_with_documents,
             repo_root=repo_root,
             output_path=output_path,
-            documents_dir=os.path.join(repo_root, "data", "documents")
-        )
+            documents_dir=os.path.join(repo_root, "data", "documents"),
+            # Documents are embedded from memory below; a temp clone is deleted
+            # afterwards, so writing them to disk there is wasted I/O
+            save_documents=not repo_url,
+            max_workers=1
+        ))
         
         nodes = results['nodes']
         edges = results['edges']
         documents = results['documents']
         
-        # Phase 3: Generate embeddings
-        active_jobs[job_id]["status"] = "generating_embeddings"
-        logger.info(f"Generating embeddings with model: {model_name}")
-        embeddings = embed_documents_simple(documents, model_name=model_name)
-        
-        # Phase 4: Index to Qdrant
-        active_jobs[job_id]["status"] = "indexing_to_qdrant"
-        qdrant_client_url = qdrant_url or os.getenv("QDRANT_URL", "http://localhost:6333")
-        logger.info(f"Connecting to Qdrant at {qdrant_client_url}")
-        client = QdrantClient(url=qdrant_client_url)
+        # Phase 3: Embed and index to Qdrant
+        await job_store.update(job_id, status="indexing_to_qdrant")
+        client = _get_qdrant_client(qdrant_url)
+        # Loads the model unless its dimension is already known
+        embedding_dim = await asyncio.to_thread(get_embedding_dimension, model_name)
         
         # Create collection
         if recreate_collection:
             logger.info(f"Creating/recreating collection: {collection_name}")
-            success = create_or_recreate_collection(client, collection_name, embeddings.shape[1])
+            success = await asyncio.to_thread(
+                create_or_recreate_collection, client, collection_name, embedding_dim,
+                scalar_quantization=QDRANT_SCALAR_QUANTIZATION, **QDRANT_HNSW_CONFIG
+            )
             if not success:
                 raise Exception(f"Failed to create collection: {collection_name}")
         
-        # Upsert nodes and edges with enhanced function
-        mapping = upsert_graph_data(client, collection_name, nodes, edges, embeddings)
+        # Embedding of one window overlaps with the upsert of the previous one
+        logger.info(f"Embedding and upserting {len(documents)} documents with model: {model_name}")
+        mapping = await _embed_and_upsert_pipelined(client, collection_name, nodes, documents, model_name)
+        await asyncio.to_thread(
+            upsert_edge_points, client, collection_name, edges, embedding_dim, start_id=len(nodes)
+        )
         
         if not mapping:
             raise Exception("Failed to upsert graph data")
         
+        await asyncio.to_thread(
+            persist_qdrant_mapping,
+            {point_id: node_id for node_id, point_id in mapping.items()},
+            _qdrant_map_path(collection_name, qdrant_url)
+        )
+        _invalidate_snippet_cache(collection_name)
+        _invalidate_collection_info(collection_name)
+        
         # Copy graph.json to backend data directory for loading
         backend_data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend", "data")
         if os.path.exists(backend_data_dir):
@@ -627,10 +961,10 @@ async def _background_parse_and_index_task(job_id: str, repo_url: str, repo_path
         
         # Calculate final statistics
         parse_stats = results['analysis_summary']
-        collection_info = get_collection_info(client, collection_name)
+        collection_info = await _get_collection_info_cached(client, collection_name, qdrant_url)
         
         # Store comprehensive results
-        job_results[job_id] = {
+        await job_store.set_result(job_id, {
             "success": True,
             "job_id": job_id,
             "type": "parse_and_index",
@@ -642,78 +976,55 @@ async def _background_parse_and_index_task(job_id: str, repo_url: str, repo_path
             "parse_stats": parse_stats,
             "index_stats": {
                 "points_indexed": len(mapping),
-                "embedding_dimension": embeddings.shape[1],
+                "embedding_dimension": embedding_dim,
                 "collection_info": collection_info
             },
             "completion_time": datetime.now().isoformat()
-        }
+        })
         
-        # Clean up
+        # Remove the temporary clone in the background; completion isn't held up by it
         if repo_url and temp_dir:
-            try:
-                shutil.rmtree(temp_dir)
-            except Exception as e:
-                logger.warning(f"Failed to clean up temp directory: {e}")
+            _remove_dir_in_background(temp_dir)
         
-        active_jobs[job_id]["status"] = "completed"
+        await job_store.update(job_id, status="completed")
         logger.info(f"Parse and index job {job_id} completed successfully")
         
     except Exception as e:
         logger.error(f"Parse and index job {job_id} failed: {e}")
-        job_results[job_id] = {
+        await job_store.set_result(job_id, {
             "success": False,
             "job_id": job_id,
             "type": "parse_and_index",
             "status": "failed",
             "error": str(e),
             "completion_time": datetime.now().isoformat()
-        }
-        active_jobs[job_id]["status"] = "failed"
+        })
+        await job_store.update(job_id, status="failed")
 
 @app.get("/status/{job_id}")
 async def get_job_status(job_id: str):
     """Get the status of a background job"""
     
-    # Check if job exists in active jobs
-    if job_id in active_jobs:
-        job_info = active_jobs[job_id].copy()
-        
-        # Add results if completed
-        if job_id in job_results:
-            job_info.update(job_results[job_id])
-        
+    job_info = await job_store.get(job_id)
+    if job_info is not None:
         return job_info
     
-    # Check if job exists in results only
-    if job_id in job_results:
-        return job_results[job_id]
-    
     # Job not found
     raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
 
 @app.get("/jobs")
 async def list_jobs():
     """List all jobs (active and completed)"""
-    all_jobs = {}
+    all_jobs = await job_store.all()
     
-    # Add active jobs
-    for job_id, job_info in active_jobs.items():
-        all_jobs[job_id] = job_info.copy()
-        
-        # Add results if available
-        if job_id in job_results:
-            all_jobs[job_id].update(job_results[job_id])
-    
-    # Add completed jobs not in active
-    for job_id, result in job_results.items():
-        if job_id not in all_jobs:
-            all_jobs[job_id] = result
+    # Count statuses in one pass instead of one list per status
+    status_counts = Counter(j.get('status') for j in all_jobs.values())
     
     return {
         "total_jobs": len(all_jobs),
-        "active_jobs": len([j for j in all_jobs.values() if j.get('status') in ['started', 'processing']]),
-        "completed_jobs": len([j for j in all_jobs.values() if j.get('status') == 'completed']),
-        "failed_jobs": len([j for j in all_jobs.values() if j.get('status') == 'failed']),
+        "active_jobs": status_counts['started'] + status_counts['processing'],
+        "completed_jobs": status_counts['completed'],
+        "failed_jobs": status_counts['failed'],
         "jobs": all_jobs
     }
 
@@ -721,14 +1032,9 @@ async def list_jobs():
 async def cancel_job(job_id: str):
     """Cancel a job (if possible) and remove from tracking"""
     
-    if job_id not in active_jobs and job_id not in job_results:
-        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
-    
     # Remove from tracking
-    if job_id in active_jobs:
-        del active_jobs[job_id]
-    if job_id in job_results:
-        del job_results[job_id]
+    if not await job_store.delete(job_id):
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
     
     return {
         "success": True,
@@ -743,6 +1049,25 @@ class AnalyzeRequest(BaseModel):
     qdrant_url: Optional[str] = None
     include_full_graph: bool = False
 
+@dataclass(slots=True)
+class AnalysisSummary:
+    """Summary block of an /analyze response (serialized as a plain object)."""
+    one_liner: str
+    steps: List[str]
+    inputs_outputs: List[str]
+    caveats: List[str]
+    node_refs: List[Dict[str, str]]
+    
+    @classmethod
+    def no_results(cls, query: str) -> "AnalysisSummary":
+        return cls(
+            one_liner=f"No relevant code found for query: {query}",
+            steps=[],
+            inputs_outputs=[],
+            caveats=["No matching code components found"],
+            node_refs=[]
+        )
+
 @app.post("/analyze")
 async def analyze_query(request: AnalyzeRequest):
     """
@@ -786,13 +1111,7 @@ async def analyze_query(request: AnalyzeRequest):
                 "answer_path": [],
                 "path_edges": [],
                 "snippets": [],
-                "summary": {
-                    "one_liner": f"No relevant code found for query: {request.query}",
-                    "steps": [],
-                    "inputs_outputs": [],
-                    "caveats": ["No matching code components found"],
-                    "node_refs": []
-                },
+                "summary": AnalysisSummary.no_results(request.query),
                 "query": request.query,
                 "processing_time": time.time() - start_time
             }
@@ -835,6 +1154,82 @@ async def analyze_query(request: AnalyzeRequest):
             "processing_time": time.time() - start_time
         }
 
+# Snippets per frame of /analyze/stream
+ANALYZE_STREAM_CHUNK = int(os.getenv("ANALYZE_STREAM_CHUNK", "4"))
+
+def _ndjson(frame: Dict) -> bytes:
+    return orjson.dumps(frame, default=str) + b"\n"
+
+@app.post("/analyze/stream")
+async def analyze_query_stream(request: AnalyzeRequest):
+    """
+    Same pipeline as /analyze, streamed as NDJSON so the client can render
+    the path while snippets are still being fetched.
+    
+    Each line is one JSON object tagged by "type":
+    - path: answer_path, path_edges, query, total_results
+    - snippets: the next ANALYZE_STREAM_CHUNK snippets along the path
+    - summary: summary, processing_time (always the last frame on success)
+    - error: error, processing_time
+    """
+    async def frames():
+        start_time = time.time()
+        try:
+            search_response = await search_repository(SearchRequest(
+                query=request.query,
+                top_k=request.top_k,
+                collection_name=request.collection_name,
+                qdrant_url=request.qdrant_url
+            ))
+            
+            if not search_response.get("success", False):
+                yield _ndjson({
+                    "type": "error",
+                    "error": f"Search failed: {search_response.get('error', 'Unknown error')}",
+                    "processing_time": time.time() - start_time
+                })
+                return
+            
+            search_results = search_response.get("results", [])
+            answer_path, path_edges = _compute_answer_path([result["node_id"] for result in search_results])
+            yield _ndjson({
+                "type": "path",
+                "answer_path": answer_path,
+                "path_edges": path_edges,
+                "query": request.query,
+                "total_results": len(search_results)
+            })
+            
+            snippets = []
+            for i in range(0, len(answer_path), ANALYZE_STREAM_CHUNK):
+                chunk = await _get_code_snippets_from_qdrant(
+                    answer_path[i:i + ANALYZE_STREAM_CHUNK],
+                    request.collection_name,
+                    request.qdrant_url
+                )
+                snippets.extend(chunk)
+                yield _ndjson({"type": "snippets", "snippets": chunk})
+            
+            if search_results:
+                summary = _generate_analysis_summary(snippets, request.query, search_results)
+            else:
+                summary = AnalysisSummary.no_results(request.query)
+            yield _ndjson({
+                "type": "summary",
+                "summary": summary,
+                "processing_time": time.time() - start_time
+            })
+        
+        except Exception as e:
+            logger.error(f"Streaming analysis failed: {e}")
+            yield _ndjson({
+                "type": "error",
+                "error": str(e),
+                "processing_time": time.time() - start_time
+            })
+    
+    return StreamingResponse(frames(), media_type="application/x-ndjson")
+
 def _compute_answer_path(node_ids: List[str]) -> tuple:
     """
     Compute optimal path through relevant nodes using simple connection logic.
@@ -858,82 +1253,194 @@ def _compute_answer_path(node_ids: List[str]) -> tuple:
     
     return answer_path, path_edges
 
+# Per-collection point_id -> node_id maps written after indexing
+QDRANT_MAP_DIR = os.getenv("QDRANT_MAP_DIR", os.path.join("data", "qdrant_maps"))
+
+def _qdrant_map_path(collection_name: str, qdrant_url: Optional[str] = None) -> str:
+    # Same-named collections on different Qdrant servers get separate maps
+    url = qdrant_url or os.getenv("QDRANT_URL", "http://localhost:6333")
+    url_hash = hashlib.sha1(url.encode()).hexdigest()[:12]
+    return os.path.join(QDRANT_MAP_DIR, f"{collection_name}.{url_hash}.json")
+
+@lru_cache(maxsize=16)
+def _read_node_to_point(path: str, mtime_ns: int) -> Dict[str, int]:
+    # mtime_ns is part of the cache key so a re-index invalidates the entry
+    return {node_id: point_id for point_id, node_id in load_qdrant_mapping(path).items()}
+
+def _qdrant_map_version(collection_name: str, qdrant_url: Optional[str] = None) -> int:
+    """st_mtime_ns of a collection's map file (0 if none): changes on every re-index."""
+    try:
+        return os.stat(_qdrant_map_path(collection_name, qdrant_url)).st_mtime_ns
+    except OSError:
+        return 0
+
+def _node_to_point_ids(collection_name: str, qdrant_url: Optional[str] = None) -> Dict[str, int]:
+    """node_id -> Qdrant point id for a collection, or {} if no map was saved."""
+    mtime_ns = _qdrant_map_version(collection_name, qdrant_url)
+    if not mtime_ns:
+        return {}
+    try:
+        return _read_node_to_point(_qdrant_map_path(collection_name, qdrant_url), mtime_ns)
+    except (OSError, ValueError):
+        return {}
+
+# Recently served snippet payloads, keyed by (qdrant_url, collection, map
+# version, node_id). The map version lets worker processes that did not run
+# a re-index stop serving its stale payloads too.
+SNIPPET_CACHE_SIZE = int(os.getenv("SNIPPET_CACHE_SIZE", "10000"))
+_snippet_payload_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+
+def _invalidate_snippet_cache(collection_name: str) -> None:
+    """Drop cached payloads of a collection after it was (re)indexed."""
+    for key in [key for key in _snippet_payload_cache if key[1] == collection_name]:
+        del _snippet_payload_cache[key]
+
+def _snippet_from_payload(node_id: str, payload: Dict) -> Dict:
+    return {
+        "node_id": node_id,
+        "code": payload.get('snippet', ''),
+        "code_preview": payload.get('code_preview', ''),
+        "file": payload.get('file', ''),
+        "start_line": payload.get('start_line', 0),
+        "end_line": payload.get('end_line', 0),
+        "doc": payload.get('doc', '')
+    }
+
+# Read-only prototypes for nodes whose snippet could not be fetched
+_PLACEHOLDER_SNIPPET: Mapping[str, Any] = MappingProxyType({
+    "code": "# Code snippet not available",
+    "file": "unknown",
+    "start_line": 0,
+    "end_line": 0,
+    "doc": ""
+})
+_ERROR_PLACEHOLDER_SNIPPET: Mapping[str, Any] = MappingProxyType({
+    **_PLACEHOLDER_SNIPPET,
+    "doc": "Error retrieving code snippet"
+})
+
+def _placeholder_snippet(node_id: str, template: Mapping[str, Any] = _PLACEHOLDER_SNIPPET) -> Dict:
+    return {"node_id": node_id, **template}
+
 async def _get_code_snippets_from_qdrant(node_ids: List[str], collection_name: str, qdrant_url: str) -> List[Dict]:
     """Get code snippets for given node IDs from Qdrant"""
     snippets = []
     
     try:
-        # Connect to Qdrant
-        qdrant_client_url = qdrant_url or os.getenv("QDRANT_URL", "http://localhost:6333")
-        client = QdrantClient(url=qdrant_client_url)
-        
-        # Get points by scrolling and filtering
+        # Hot nodes are served from the LRU; only misses go to Qdrant
+        payload_by_id = {}
+        missing = []
+        map_version = _qdrant_map_version(collection_name, qdrant_url)
         for node_id in node_ids:
-            try:
-                # Scroll through collection to find matching node_id
-                all_points, _ = client.scroll(
-                    collection_name=collection_name,
-                    limit=100,
-                    with_payload=True,
-                    scroll_filter={"must": [{"key": "node_id", "match": {"value": node_id}}]}
-                )
-                
-                for point in all_points:
-                    payload = point.payload or {}
-                    if payload.get('node_id') == node_id:
-                        snippets.append({
-                            "node_id": node_id,
-                            "code": payload.get('snippet', ''),
-                            "file": payload.get('file', ''),
-                            "start_line": payload.get('start_line', 0),
-                            "end_line": payload.get('end_line', 0),
-                            "doc": payload.get('doc', '')
-                        })
-                        break
-                        
-            except Exception as e:
-                logger.warning(f"Failed to get snippet for node {node_id}: {e}")
-                # Add placeholder snippet
-                snippets.append({
-                    "node_id": node_id,
-                    "code": "# Code snippet not available",
-                    "file": "unknown",
-                    "start_line": 0,
-                    "end_line": 0,
-                    "doc": ""
-                })
+            key = (qdrant_url, collection_name, map_version, node_id)
+            if key in _snippet_payload_cache:
+                _snippet_payload_cache.move_to_end(key)
+                payload_by_id[node_id] = _snippet_payload_cache[key]
+            elif node_id not in missing:
+                missing.append(node_id)
+        
+        # Connect to Qdrant
+        client = _get_qdrant_client(qdrant_url)
+        
+        # Nodes with a known point id are fetched by key; the rest through
+        # one payload-filtered scroll
+        node_to_point = _node_to_point_ids(collection_name, qdrant_url) if missing else {}
+        point_ids = [node_to_point[node_id] for node_id in missing if node_id in node_to_point]
+        unmapped = [node_id for node_id in missing if node_id not in node_to_point]
+        
+        points = []
+        if point_ids:
+            retrieved = await asyncio.to_thread(
+                client.retrieve,
+                collection_name=collection_name,
+                ids=point_ids,
+                with_payload=True,
+                with_vectors=False
+            )
+            # A stale map can point at other nodes' points; keep only the
+            # requested ones and look the rest up by payload below
+            requested = set(missing)
+            points.extend(point for point in retrieved if (point.payload or {}).get('node_id') in requested)
+            found = {point.payload['node_id'] for point in points}
+            unmapped.extend(node_id for node_id in missing if node_id in node_to_point and node_id not in found)
+        if unmapped:
+            # The limit leaves room for duplicate points of the same node
+            scrolled, _ = await asyncio.to_thread(
+                client.scroll,
+                collection_name=collection_name,
+                limit=len(unmapped) * 2,
+                with_payload=True,
+                with_vectors=False,
+                scroll_filter=Filter(must=[FieldCondition(key="node_id", match=MatchAny(any=unmapped))])
+            )
+            points.extend(scrolled)
+        
+        # Every point matched a requested node_id, so the payloads are keyed
+        # directly; the first point wins for nodes stored more than once
+        for point in points:
+            payload = point.payload or {}
+            node_id = payload.get('node_id')
+            if node_id in payload_by_id:
+                continue
+            payload_by_id[node_id] = payload
+            _snippet_payload_cache[(qdrant_url, collection_name, map_version, node_id)] = payload
+        while len(_snippet_payload_cache) > SNIPPET_CACHE_SIZE:
+            _snippet_payload_cache.popitem(last=False)
+        
+        # Preserve the caller's ordering
+        snippets = [
+            _snippet_from_payload(node_id, payload_by_id[node_id]) if node_id in payload_by_id
+            else _placeholder_snippet(node_id)
+            for node_id in node_ids
+        ]
     
     except Exception as e:
         logger.error(f"Failed to get code snippets: {e}")
         # Return placeholder snippets
-        for node_id in node_ids:
-            snippets.append({
-                "node_id": node_id,
-                "code": "# Code snippet not available",
-                "file": "unknown",
-                "start_line": 0,
-                "end_line": 0,
-                "doc": "Error retrieving code snippet"
-            })
+        snippets = [_placeholder_snippet(node_id, _ERROR_PLACEHOLDER_SNIPPET) for node_id in node_ids]
     
     return snippets
 
-def _generate_analysis_summary(snippets: List[Dict], query: str, search_results: List[Dict]) -> Dict:
+# Summary text templates, bound once instead of parsed per call
+_ONE_LINER = "Analysis of {} code components across {} files related to: {}".format
+_STEP = "{}. {} in {}: {}".format
+_STATIC_CAVEATS = (
+    "Analysis based on static code structure and semantic similarity",
+    "Results limited to indexed code components",
+)
+
+def _generate_analysis_summary(snippets: List[Dict], query: str, search_results: List[Dict]) -> AnalysisSummary:
     """Generate analysis summary from code snippets"""
     
-    # Extract key information
-    files_involved = list(set(snippet.get('file', 'unknown') for snippet in snippets))
+    # Collect files, steps (first 5) and node references (first 3) in one pass
+    files_seen = set()
+    steps = []
+    node_refs = []
+    for i, snippet in enumerate(snippets):
+        get = snippet.get
+        file_name = get('file', 'unknown')
+        files_seen.add(file_name)
+        if i >= 5:
+            continue
+        
+        node_id = get('node_id', '')
+        head, sep, _ = node_id.partition(':')
+        node_name = head if sep else 'Component'
+        steps.append(_STEP(i + 1, node_name, file_name, get('doc', 'Code execution')[:50]))
+        
+        if i < 3:
+            first_line, _, _ = get('code', '').partition('\n')
+            excerpt = first_line[:50] + "..." if len(first_line) > 50 else first_line
+            node_refs.append({
+                "node_id": node_id,
+                "excerpt_line": excerpt
+            })
+    
+    files_involved = list(files_seen)
     total_snippets = len(snippets)
     
     # Generate one-liner summary
-    one_liner = f"Analysis of {total_snippets} code components across {len(files_involved)} files related to: {query}"
-    
-    # Generate steps
-    steps = []
-    for i, snippet in enumerate(snippets[:5]):  # Limit to first 5
-        node_name = snippet.get('node_id', '').split(':')[0] if ':' in snippet.get('node_id', '') else 'Component'
-        file_name = snippet.get('file', 'unknown')
-        steps.append(f"{i+1}. {node_name} in {file_name}: {snippet.get('doc', 'Code execution')[:50]}")
+    one_liner = _ONE_LINER(total_snippets, len(files_involved), query)
     
     # Generate inputs/outputs
     inputs_outputs = [
@@ -943,47 +1450,33 @@ def _generate_analysis_summary(snippets: List[Dict], query: str, search_results:
     ]
     
     # Generate caveats
-    caveats = [
-        "Analysis based on static code structure and semantic similarity",
-        "Results limited to indexed code components",
-        f"Search performed on top {len(search_results)} matches"
-    ]
-    
-    # Generate node references
-    node_refs = []
-    for snippet in snippets[:3]:  # Limit to first 3
-        code_lines = snippet.get('code', '').split('\n')
-        excerpt = code_lines[0][:50] + "..." if code_lines and len(code_lines[0]) > 50 else (code_lines[0] if code_lines else "")
-        node_refs.append({
-            "node_id": snippet.get('node_id', ''),
-            "excerpt_line": excerpt
-        })
+    caveats = [*_STATIC_CAVEATS, f"Search performed on top {len(search_results)} matches"]
     
-    return {
-        "one_liner": one_liner,
-        "steps": steps,
-        "inputs_outputs": inputs_outputs,
-        "caveats": caveats,
-        "node_refs": node_refs
-    }
+    return AnalysisSummary(
+        one_liner=one_liner,
+        steps=steps,
+        inputs_outputs=inputs_outputs,
+        caveats=caveats,
+        node_refs=node_refs
+    )
 async def list_qdrant_collections():
     """List available Qdrant collections"""
     try:
         qdrant_url = os.getenv("QDRANT_URL", "http://localhost:6333")
-        client = QdrantClient(url=qdrant_url)
+        client = _get_qdrant_client(qdrant_url)
         
-        collections = client.get_collections()
-        collection_details = []
+        collections = await asyncio.to_thread(client.get_collections)
+        names = [collection.name for collection in collections.collections]
         
-        for collection in collections.collections:
-            try:
-                info = get_collection_info(client, collection.name)
-                collection_details.append(info)
-            except Exception as e:
-                collection_details.append({
-                    "name": collection.name,
-                    "error": str(e)
-                })
+        # Look up every collection concurrently instead of one round trip at a time
+        infos = await asyncio.gather(
+            *(_get_collection_info_cached(client, name, qdrant_url) for name in names),
+            return_exceptions=True
+        )
+        collection_details = [
+            {"name": name, "error": str(info)} if isinstance(info, Exception) else info
+            for name, info in zip(names, infos)
+        ]
         
         return {
             "qdrant_url": qdrant_url,
@@ -1007,10 +1500,10 @@ async def force_index_collection(request: dict):
     
     try:
         # Connect to Qdrant
-        client = QdrantClient(url=qdrant_url)
+        client = _get_qdrant_client(qdrant_url)
         
         # Check collection status
-        collection_info = get_collection_info(client, collection_name)
+        collection_info = await asyncio.to_thread(get_collection_info, client, collection_name)
         if not collection_info:
             return {
                 "success": False,
@@ -1034,11 +1527,12 @@ async def force_index_collection(request: dict):
             # This API call forces Qdrant to optimize the collection and index vectors
             import requests
             optimize_url = f"{qdrant_url}/collections/{collection_name}/index"
-            response = requests.post(optimize_url, json={"wait": True})
+            response = await asyncio.to_thread(requests.post, optimize_url, json={"wait": True})
             
             if response.status_code == 200:
+                _invalidate_collection_info(collection_name)
                 # Check if indexing is now complete
-                updated_info = get_collection_info(client, collection_name)
+                updated_info = await asyncio.to_thread(get_collection_info, client, collection_name)
                 updated_indexed = updated_info.get('indexed_vectors_count', 0)
                 
                 return {
@@ -1075,5 +1569,23 @@ if __name__ == "__main__":
     host = os.getenv("WORKER_HOST", "0.0.0.0")
     port = int(os.getenv("WORKER_PORT", "8002"))
     
-    logger.info(f"Starting Worker Service on {host}:{port}")
-    uvicorn.run(app, host=host, port=port)
+    # Each worker process imports the app and runs its own lifespan, so Qdrant
+    # clients, caches and the query batcher are per process. Jobs are only
+    # visible across workers through the Redis job store, hence one worker
+    # by default without REDIS_URL.
+    default_workers = (os.cpu_count() or 2) if os.getenv("REDIS_URL") else 1
+    workers = int(os.getenv("WORKER_WORKERS", str(default_workers)))
+    if workers > 1 and not os.getenv("REDIS_URL"):
+        logger.warning("WORKER_WORKERS > 1 without REDIS_URL: /status and /jobs only see jobs of the answering worker")
+    
+    logger.info(f"Starting Worker Service on {host}:{port} with {workers} worker(s)")
+    # loop/http "auto" pick uvloop and httptools when installed (uvicorn[standard])
+    uvicorn.run(
+        "app:app" if workers > 1 else app,
+        host=host,
+        port=port,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        log_level="info"
+    )
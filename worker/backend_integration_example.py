@@ -1,13 +1,25 @@
 """
 Backend Integration Example for Worker Service
 This file shows exactly how the backend should integrate with the Worker Service.
+
+WorkerServiceClient keeps one pooled aiohttp session for all calls; create it
+once (e.g. at app startup) and `await client.close()` on shutdown, or use it
+as `async with WorkerServiceClient() as client: ...`.
 """
 
 import asyncio
 import aiohttp
 import json
+import random
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # optional; the worker then answers in JSON
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
 
 class WorkerServiceClient:
     """Client for interacting with the Worker Service"""
@@ -15,6 +27,37 @@ class WorkerServiceClient:
     def __init__(self, worker_url: str = "http://localhost:8002"):
         self.worker_url = worker_url
         self.timeout = aiohttp.ClientTimeout(total=300)  # 5 minutes
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    async def __aenter__(self) -> "WorkerServiceClient":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Shared session so every call (and every status poll) reuses pooled connections"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                # msgpack bodies are smaller and faster to decode than JSON for code-heavy payloads
+                headers={"Accept": f"{MSGPACK_MEDIA_TYPE}, application/json"} if msgpack else None,
+                connector=aiohttp.TCPConnector(limit=100, limit_per_host=50, keepalive_timeout=30)
+            )
+        return self._session
+    
+    @staticmethod
+    async def _read_body(response: aiohttp.ClientResponse) -> Dict:
+        """Decode a worker response, msgpack or JSON depending on what it sent"""
+        if msgpack is not None and response.content_type == MSGPACK_MEDIA_TYPE:
+            return msgpack.unpackb(await response.read(), raw=False)
+        return await response.json()
+    
+    async def close(self) -> None:
+        """Close the pooled session; call on shutdown (or use `async with WorkerServiceClient()`)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
     
     async def parse_repository(self, repo_url: str, branch: str = "main") -> Dict:
         """
@@ -26,29 +69,35 @@ class WorkerServiceClient:
             "branch": branch
         }
         
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            async with session.post(f"{self.worker_url}/parse", json=payload) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Parse failed: {error_text}")
+        session = await self._get_session()
+        async with session.post(f"{self.worker_url}/parse", json=payload) as response:
+            if response.status == 200:
+                return await self._read_body(response)
+            else:
+                error_text = await response.text()
+                raise Exception(f"Parse failed: {error_text}")
     
     async def get_job_status(self, job_id: str) -> Dict:
         """Get the status of a background job"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{self.worker_url}/status/{job_id}") as response:
-                if response.status == 200:
-                    return await response.json()
-                elif response.status == 404:
-                    raise Exception(f"Job {job_id} not found")
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Status check failed: {error_text}")
+        session = await self._get_session()
+        async with session.get(f"{self.worker_url}/status/{job_id}") as response:
+            if response.status == 200:
+                return await self._read_body(response)
+            elif response.status == 404:
+                raise Exception(f"Job {job_id} not found")
+            else:
+                error_text = await response.text()
+                raise Exception(f"Status check failed: {error_text}")
     
     async def wait_for_job_completion(self, job_id: str, max_wait: int = 300) -> Dict:
-        """Wait for a job to complete and return the results"""
+        """
+        Wait for a job to complete and return the results.
+        
+        Polls quickly at first (short jobs finish in well under a second) and
+        backs off exponentially with jitter up to 10s between polls.
+        """
         start_time = time.time()
+        delay = 0.25
         
         while time.time() - start_time < max_wait:
             status = await self.get_job_status(job_id)
@@ -58,8 +107,10 @@ class WorkerServiceClient:
             elif status.get("status") == "failed":
                 raise Exception(f"Job failed: {status.get('error', 'Unknown error')}")
             
-            # Wait before polling again
-            await asyncio.sleep(5)
+            # Wait before polling again, never past the deadline
+            remaining = max_wait - (time.time() - start_time)
+            await asyncio.sleep(max(0.0, min(delay + random.uniform(0, delay * 0.1), remaining)))
+            delay = min(delay * 1.5, 10.0)
         
         raise Exception(f"Job {job_id} timed out after {max_wait} seconds")
     
@@ -74,13 +125,13 @@ class WorkerServiceClient:
             "collection_name": collection_name
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(f"{self.worker_url}/search", json=payload) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Search failed: {error_text}")
+        session = await self._get_session()
+        async with session.post(f"{self.worker_url}/search", json=payload) as response:
+            if response.status == 200:
+                return await self._read_body(response)
+            else:
+                error_text = await response.text()
+                raise Exception(f"Search failed: {error_text}")
     
     async def analyze_query(self, query: str, top_k: int = 10, collection_name: str = "repocanvas") -> Dict:
         """
@@ -93,13 +144,36 @@ class WorkerServiceClient:
             "include_full_graph": False
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(f"{self.worker_url}/analyze", json=payload) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Analysis failed: {error_text}")
+        session = await self._get_session()
+        async with session.post(f"{self.worker_url}/analyze", json=payload) as response:
+            if response.status == 200:
+                return await self._read_body(response)
+            else:
+                error_text = await response.text()
+                raise Exception(f"Analysis failed: {error_text}")
+    
+    async def analyze_query_stream(
+        self, query: str, top_k: int = 10, collection_name: str = "repocanvas"
+    ) -> AsyncIterator[Dict]:
+        """
+        Streaming variant of analyze_query: yields the worker's NDJSON frames
+        ("path", then "snippets" chunks, then "summary" or "error") as they arrive.
+        """
+        payload = {
+            "query": query,
+            "top_k": top_k,
+            "collection_name": collection_name,
+            "include_full_graph": False
+        }
+        
+        session = await self._get_session()
+        async with session.post(f"{self.worker_url}/analyze/stream", json=payload) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise Exception(f"Analysis failed: {error_text}")
+            async for line in response.content:
+                if line.strip():
+                    yield json.loads(line)
     
     async def index_repository(self, collection_name: str = "repocanvas", graph_path: str = None) -> Dict:
         """Index repository data to Qdrant for semantic search"""
@@ -111,13 +185,13 @@ class WorkerServiceClient:
         if graph_path:
             payload["graph_path"] = graph_path
         
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            async with session.post(f"{self.worker_url}/index", json=payload) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Indexing failed: {error_text}")
+        session = await self._get_session()
+        async with session.post(f"{self.worker_url}/index", json=payload) as response:
+            if response.status == 200:
+                return await self._read_body(response)
+            else:
+                error_text = await response.text()
+                raise Exception(f"Indexing failed: {error_text}")
     
     async def parse_and_index_repository(self, repo_url: str, branch: str = "main", collection_name: str = "repocanvas") -> Dict:
         """Complete pipeline: parse repository and index to Qdrant"""
@@ -128,13 +202,13 @@ class WorkerServiceClient:
             "recreate_collection": True
         }
         
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            async with session.post(f"{self.worker_url}/parse-and-index", json=payload) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Parse and index failed: {error_text}")
+        session = await self._get_session()
+        async with session.post(f"{self.worker_url}/parse-and-index", json=payload) as response:
+            if response.status == 200:
+                return await self._read_body(response)
+            else:
+                error_text = await response.text()
+                raise Exception(f"Parse and index failed: {error_text}")
 
 
 # Example usage in FastAPI backend
@@ -308,6 +382,8 @@ async def example_integration_workflow():
         
     except Exception as e:
         print(f"\n❌ Integration workflow failed: {e}")
+    finally:
+        await worker.close()
 
 
 # Example of expected graph JSON format
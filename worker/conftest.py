@@ -0,0 +1,18 @@
+"""
+Shared pytest fixtures for the RepoCanvas Worker tests
+"""
+
+import os
+
+import pytest
+
+from parse_repo import parse_repository
+
+WORKER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope="session")
+def parsed_graph(tmp_path_factory):
+    """Parse the worker directory once and share the graph across tests"""
+    output_file = tmp_path_factory.mktemp("graph") / "graph.json"
+    return parse_repository(WORKER_DIR, str(output_file))
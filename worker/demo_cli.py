@@ -15,17 +15,14 @@ def run_command(cmd, description):
     print(f"Command: {' '.join(cmd)}")
     print("-" * 60)
     
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        print(result.stdout)
-        if result.stderr:
-            print("STDERR:", result.stderr)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Command failed with exit code {e.returncode}")
-        print("STDOUT:", e.stdout)
-        print("STDERR:", e.stderr)
+    # The child writes straight to our stdout/stderr, so long parses show
+    # progress as it happens instead of buffering all output in memory
+    sys.stdout.flush()
+    returncode = subprocess.run(cmd).returncode
+    if returncode != 0:
+        print(f"❌ Command failed with exit code {returncode}")
         return False
+    return True
 
 def main():
     """Demonstrate CLI functionality."""
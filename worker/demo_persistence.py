@@ -4,10 +4,12 @@ Demo script showing the Qdrant persistence functionality.
 This simulates what happens during the --index process.
 """
 
-import json
-import datetime
 import os
 import sys
+from itertools import islice
+from pathlib import Path
+
+import orjson
 
 # Add the current directory to Python path for imports
 sys.path.append(os.path.dirname(__file__))
@@ -60,17 +62,21 @@ def simulate_indexing_persistence():
     # Show the results
     print("\n5️⃣  Verification:")
     
+    saved_mapping = {}
+    saved_metadata = {}
+    
     # Check qdrant_map.json
-    if os.path.exists("data/qdrant_map.json"):
-        with open("data/qdrant_map.json", "r") as f:
-            saved_mapping = json.load(f)
+    map_path = Path("data/qdrant_map.json")
+    if map_path.exists():
+        saved_mapping = orjson.loads(map_path.read_bytes())
         print(f"   ✅ qdrant_map.json: {len(saved_mapping)} mappings")
-        print(f"      Sample: {dict(list(saved_mapping.items())[:2])}")
+        # Preview without materializing every entry of a large map
+        print(f"      Sample: {dict(islice(saved_mapping.items(), 2))}")
     
     # Check index_status.json
-    if os.path.exists("data/index_status.json"):
-        with open("data/index_status.json", "r") as f:
-            saved_metadata = json.load(f)
+    status_path = Path("data/index_status.json")
+    if status_path.exists():
+        saved_metadata = orjson.loads(status_path.read_bytes())
         print(f"   ✅ index_status.json: Status = {saved_metadata.get('status')}")
         print(f"      Collection: {saved_metadata.get('collection_name')}")
         print(f"      Model: {saved_metadata.get('model_name')}")
@@ -1,16 +1,20 @@
 # backend/worker/graph/graph_loader.py
 import networkx as nx
-import json
+import orjson
 
 def build_graph(nodes, edges):
+    # Bulk inserts: NetworkX handles the whole batch in one call each
     G = nx.DiGraph()
-    for n in nodes:
-        G.add_node(n['id'], **n)
-    for e in edges:
-        src, tgt = e['from'], e['to']
-        G.add_edge(src, tgt, **{k:v for k,v in e.items() if k not in ['from','to']})
+    G.add_nodes_from((n['id'], n) for n in nodes)
+    G.add_edges_from(
+        (e['from'], e['to'], {k: v for k, v in e.items() if k != 'from' and k != 'to'})
+        for e in edges
+    )
     return G
 
 def save_graph_json(nodes, edges, out_path):
-    with open(out_path, 'w', encoding='utf-8') as f:
-        json.dump({"nodes": nodes, "edges": edges}, f, indent=2)
+    with open(out_path, 'wb') as f:
+        f.write(orjson.dumps(
+            {"nodes": nodes, "edges": edges},
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ))
@@ -1,12 +1,23 @@
 # backend/worker/indexer/embedder.py
-from sentence_transformers import SentenceTransformer
 import numpy as np
-from tqdm import tqdm
-from typing import List, Optional, Dict
+from typing import TYPE_CHECKING, List, Dict
+import os
 import re
+import multiprocessing
+from functools import lru_cache, partial
+from bisect import bisect_right
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+if TYPE_CHECKING:
+    # Imported lazily at runtime: it pulls in torch, which dominates import time
+    from sentence_transformers import SentenceTransformer
 
 MODEL_NAME = "all-MiniLM-L6-v2"
 
+# "sentence-transformers" (PyTorch) or "onnx" (ONNX Runtime export of the
+# model in ONNX_MODEL_DIR, see onnx_embedder.py)
+EMBEDDER_BACKEND = os.getenv("EMBEDDER_BACKEND", "sentence-transformers").lower()
+
 # Language-specific context for better embeddings
 LANGUAGE_CONTEXTS = {
     'python': {
@@ -59,18 +70,128 @@ LANGUAGE_CONTEXTS = {
     }
 }
 
+# Torch device for the embedding model ("cuda", "cpu", ...); detected once when unset
+EMBEDDER_DEVICE = os.getenv("EMBEDDER_DEVICE")
+
+@lru_cache(maxsize=1)
+def get_device() -> str:
+    """The device models are loaded on, probing CUDA only once per process."""
+    if EMBEDDER_DEVICE:
+        return EMBEDDER_DEVICE
+    try:
+        import torch
+    except ImportError:  # e.g. the ONNX backend without PyTorch installed
+        return "cpu"
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+# Encoder precision: "auto" (FP16 on CUDA, FP32 on CPU), "fp32", "fp16" (CUDA
+# only) or "int8" (dynamic int8 quantization of the Linear layers, CPU only)
+EMBEDDER_PRECISION = os.getenv("EMBEDDER_PRECISION", "auto").lower()
+
+def _effective_precision(device: str) -> str:
+    """The precision the model actually runs at on device (unsupported choices use FP32)."""
+    precision = EMBEDDER_PRECISION
+    if precision == "auto":
+        precision = "fp16" if device.startswith("cuda") else "fp32"
+    if (precision == "fp16" and device.startswith("cuda")) or (precision == "int8" and device == "cpu"):
+        return precision
+    return "fp32"
+
+def _apply_precision(model: "SentenceTransformer", device: str) -> "SentenceTransformer":
+    precision = _effective_precision(device)
+    if precision == "fp16":
+        print("Using FP16 weights for the embedding model")
+        return model.half()
+    if precision == "int8":
+        import torch
+        print("Using dynamic int8 quantization for the embedding model")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if EMBEDDER_PRECISION not in ("auto", "fp32"):
+        print(f"Embedder precision {EMBEDDER_PRECISION} is not supported on {device}; using FP32")
+    return model
+
+def embedding_config_key(model_name: str = MODEL_NAME) -> str:
+    """
+    Identify everything that determines a model's vectors: the model, the
+    backend and, for PyTorch, the precision it runs at on this device.
+    """
+    if EMBEDDER_BACKEND == "onnx":
+        return f"{model_name}|onnx"
+    return f"{model_name}|{EMBEDDER_BACKEND}|{_effective_precision(get_device())}"
+
+@lru_cache(maxsize=4)
+def _load_model(model_name: str, device: str) -> "SentenceTransformer":
+    if EMBEDDER_BACKEND == "onnx":
+        from .onnx_embedder import OnnxSentenceEncoder, ONNX_MODEL_DIR
+        print(f"Loading ONNX embedding model from: {ONNX_MODEL_DIR}")
+        return OnnxSentenceEncoder(ONNX_MODEL_DIR, model_name=model_name)
+    
+    print(f"Loading embedding model: {model_name} on {device}")
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name, device=device)
+    model.eval()
+    return _apply_precision(model, device)
+
+def _get_model(model_name: str = MODEL_NAME) -> "SentenceTransformer":
+    """
+    Load a sentence-transformers model once per process and reuse it.
+    
+    Loading takes seconds and hundreds of MB, so every embedding helper
+    shares the same instance per (model name, device). The device is passed
+    explicitly so sentence-transformers does not probe for one on each load.
+    With EMBEDDER_BACKEND=onnx the ONNX export in ONNX_MODEL_DIR (which must
+    be an export of model_name, and is exported there on first use if
+    missing) is loaded instead.
+    """
+    return _load_model(model_name, get_device())
+
+def encode_texts(texts: List[str], model_name: str = MODEL_NAME, batch_size: int = 64,
+                 normalize: bool = False) -> np.ndarray:
+    """
+    Encode short texts (e.g. search queries) with the cached model in one call.
+    
+    Args:
+        texts (List[str]): Texts to encode
+        model_name (str): Name of the sentence-transformers model
+        batch_size (int): Batch size passed to the encoder
+        normalize (bool): L2-normalize the embeddings
+    
+    Returns:
+        np.ndarray: Array of embeddings with shape (len(texts), embedding_dim)
+    """
+    return _get_model(model_name).encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=normalize,
+        show_progress_bar=False
+    )
+
+def preload_model(model_name: str = MODEL_NAME) -> None:
+    """Load a model into the process-wide cache ahead of the first request."""
+    _get_model(model_name)
+
+# Extension -> language; the first language listing an extension wins ('.h' is cpp)
+_EXTENSION_TO_LANGUAGE = {}
+for _lang, _context in LANGUAGE_CONTEXTS.items():
+    for _ext in _context['file_types']:
+        _EXTENSION_TO_LANGUAGE.setdefault(_ext, _lang)
+
 def detect_language_from_extension(file_path: str) -> str:
     """Detect programming language from file extension."""
     if not file_path:
         return 'unknown'
     
-    extension = '.' + file_path.split('.')[-1].lower()
-    
-    for lang, context in LANGUAGE_CONTEXTS.items():
-        if extension in context['file_types']:
-            return lang
-    
-    return 'unknown'
+    return _EXTENSION_TO_LANGUAGE.get('.' + file_path.rpartition('.')[2].lower(), 'unknown')
+
+# One pattern per language finding any of its keywords in a single scan; the
+# lookahead also reports keywords that overlap each other
+_KEYWORD_PATTERNS = {
+    lang: re.compile('(?=(' + '|'.join(
+        re.escape(keyword) for keyword in sorted(context['keywords'], key=len, reverse=True)
+    ) + '))')
+    for lang, context in LANGUAGE_CONTEXTS.items()
+}
 
 def enhance_code_document(text: str, language: str, node_metadata: Dict = None) -> str:
     """
@@ -110,19 +231,19 @@ def enhance_code_document(text: str, language: str, node_metadata: Dict = None)
     # Add the original text
     enhanced += text
     
-    # Add language-specific keywords context
-    code_lines = text.lower().split('\n')
-    found_keywords = []
-    for line in code_lines[:5]:  # Check first 5 lines
-        for keyword in lang_context['keywords']:
-            if keyword in line:
-                found_keywords.append(keyword)
-    
-    if found_keywords:
-        enhanced += f"\nLanguage patterns: {', '.join(set(found_keywords))}"
+    # Add language-specific keywords context (first 5 lines, substring matches)
+    head = '\n'.join(text.lower().split('\n', 5)[:5])
+    found = {match.group(1) for match in _KEYWORD_PATTERNS[language].finditer(head)}
+    if found:
+        # Listed in the language's keyword order so the document text is stable
+        keywords = [keyword for keyword in lang_context['keywords'] if keyword in found]
+        enhanced += f"\nLanguage patterns: {', '.join(keywords)}"
     
     return enhanced
 
+# Lines starting a function/class/method definition; preferred chunk boundaries
+_CODE_BOUNDARY_RE = re.compile(r"\n(?:def|class|function|public|private|func|fn) ")
+
 def chunk_text(text: str, max_length: int = 400, overlap: int = 50) -> List[str]:
     """
     Split long text into overlapping chunks for better embedding quality.
@@ -139,6 +260,14 @@ def chunk_text(text: str, max_length: int = 400, overlap: int = 50) -> List[str]
     if len(text) <= max_length:
         return [text]
     
+    # Find all code boundaries in one scan; each chunk then bisects for the
+    # last one inside its window instead of re-scanning per keyword
+    boundary_starts = []
+    boundary_ends = []
+    for match in _CODE_BOUNDARY_RE.finditer(text):
+        boundary_starts.append(match.start())
+        boundary_ends.append(match.end())
+    
     chunks = []
     start = 0
     
@@ -146,33 +275,31 @@ def chunk_text(text: str, max_length: int = 400, overlap: int = 50) -> List[str]
         # Find end position
         end = start + max_length
         
-        # If we're not at the end of the text, try to break at code boundaries first
+        # If we're not at the end of the text, try to break at code boundaries first.
+        # Breaks must lie past the overlap, or the next chunk would start
+        # before this one and find the same break again.
+        min_break = start + overlap
         if end < len(text):
-            # For code, prioritize breaking at function/class boundaries
-            code_boundaries = [
-                text.rfind('\ndef ', start, end),
-                text.rfind('\nclass ', start, end),
-                text.rfind('\nfunction ', start, end),
-                text.rfind('\npublic ', start, end),
-                text.rfind('\nprivate ', start, end),
-                text.rfind('\nfunc ', start, end),  # Go functions
-                text.rfind('\nfn ', start, end),   # Rust functions
-            ]
-            
-            # Find the best boundary
-            best_boundary = max([b for b in code_boundaries if b > start], default=-1)
+            # Last code boundary lying entirely within [start, end)
+            best_boundary = -1
+            i = bisect_right(boundary_starts, end) - 1
+            while i >= 0 and boundary_starts[i] > min_break:
+                if boundary_ends[i] <= end:
+                    best_boundary = boundary_starts[i]
+                    break
+                i -= 1
             
-            if best_boundary > start:
+            if best_boundary > min_break:
                 end = best_boundary
             else:
                 # Fallback to word boundaries
                 word_break = text.rfind(' ', start + max_length - 50, end)
-                if word_break > start:
+                if word_break > min_break:
                     end = word_break
                 else:
                     # Try to break at line boundaries
                     line_break = text.rfind('\n', start, end)
-                    if line_break > start:
+                    if line_break > min_break:
                         end = line_break
         
         chunk = text[start:end].strip()
@@ -186,8 +313,77 @@ def chunk_text(text: str, max_length: int = 400, overlap: int = 50) -> List[str]
     
     return chunks
 
+def _mean_pool_on_device(chunk_embeddings, mapping: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Mean-pool a (chunks, dim) torch tensor into (docs, dim) on its own device.
+    
+    Only the pooled result crosses to the host, not every chunk embedding.
+    """
+    import torch
+    
+    device = chunk_embeddings.device
+    if (counts == 1).all():
+        return chunk_embeddings.float().cpu().numpy()
+    
+    sums = torch.zeros((len(counts), chunk_embeddings.shape[1]), dtype=torch.float32, device=device)
+    sums.index_add_(0, torch.as_tensor(mapping, device=device), chunk_embeddings.float())
+    # Documents that produced no chunks (whitespace only) stay zero vectors
+    sums /= torch.as_tensor(np.maximum(counts, 1), dtype=torch.float32, device=device)[:, None]
+    return sums.cpu().numpy()
+
+def _mean_pool_chunks(chunk_embeddings: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Mean-pool (chunks, dim) embeddings into (docs, dim), given each document's
+    number of consecutive chunks.
+    """
+    if (counts == 1).all():
+        # Common case: every document fit in one chunk, so the chunk
+        # embeddings already are the document embeddings
+        return np.asarray(chunk_embeddings, dtype=np.float32)
+    
+    # Chunks of a document are contiguous, so each document is one slice and
+    # a single reduceat sums all of them
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    has_chunks = counts > 0
+    
+    # Accumulate in float32 even when the encoder ran in FP16
+    sums = np.zeros((len(counts), chunk_embeddings.shape[1]), dtype=np.float32)
+    sums[has_chunks] = np.add.reduceat(chunk_embeddings, starts[has_chunks], axis=0, dtype=np.float32)
+    # Documents that produced no chunks (whitespace only) stay zero vectors
+    sums /= np.maximum(counts, 1)[:, None]
+    return sums
+
+# Documents embed_documents prepares and encodes at a time (bounds peak memory)
+EMBED_DOC_WINDOW = int(os.getenv("EMBED_DOC_WINDOW", "20000"))
+
+# Documents from which embed_documents prepares chunks in a process pool
+PARALLEL_PREPARE_MIN_DOCS = int(os.getenv("EMBED_PARALLEL_PREPARE_MIN_DOCS", "2000"))
+
+def _prepare_document(doc: str, language: str, metadata: Dict) -> List[str]:
+    """Enhance a document with language context and split it into chunks."""
+    return chunk_text(enhance_code_document(doc, language, metadata), max_length=400, overlap=50)
+
+def _prepare_documents(docs: List[str], languages: List[str], metadatas: List[Dict]) -> List[List[str]]:
+    """_prepare_document over a slice of documents (one executor task)."""
+    return list(map(_prepare_document, docs, languages, metadatas))
+
+@lru_cache(maxsize=1)
+def _get_prepare_pool() -> ProcessPoolExecutor:
+    """
+    Process pool shared by every embed_documents call and window.
+    
+    Workers come from a forkserver: by the time documents are prepared the
+    model (torch, possibly CUDA) is loaded, and forking that process is
+    unsafe.
+    """
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context("forkserver")
+    )
+
 def embed_documents(docs: List[str], model_name: str = MODEL_NAME, batch_size: int = 64, 
-                   language_contexts: List[str] = None, node_metadata: List[Dict] = None) -> np.ndarray:
+                   language_contexts: List[str] = None, node_metadata: List[Dict] = None,
+                   use_cache: bool = True) -> np.ndarray:
     """
     Generate embeddings for a list of documents using sentence-transformers.
     Enhanced for multi-language code documents.
@@ -198,6 +394,7 @@ def embed_documents(docs: List[str], model_name: str = MODEL_NAME, batch_size: i
         batch_size (int): Batch size for processing
         language_contexts (List[str]): Programming languages for each document
         node_metadata (List[Dict]): Metadata for each code node
+        use_cache (bool): Reuse document embeddings from the persistent embedding cache
     
     Returns:
         np.ndarray: Array of embeddings with shape (len(docs), embedding_dim)
@@ -205,16 +402,14 @@ def embed_documents(docs: List[str], model_name: str = MODEL_NAME, batch_size: i
     if not docs:
         return np.array([])
     
-    print(f"Loading embedding model: {model_name}")
-    model = SentenceTransformer(model_name)
-    
-    # Enhanced document processing with language context
-    processed_docs = []
-    doc_chunk_mapping = []
+    model = _get_model(model_name)
     
     print(f"Processing {len(docs)} documents for embedding (multi-language support)...")
     
-    for doc_idx, doc in enumerate(docs):
+    # Enhanced document processing with language context
+    languages = []
+    metadatas = []
+    for doc_idx in range(len(docs)):
         # Get language context if available
         language = 'unknown'
         metadata = {}
@@ -228,44 +423,106 @@ def embed_documents(docs: List[str], model_name: str = MODEL_NAME, batch_size: i
             if 'file' in metadata and language == 'unknown':
                 language = detect_language_from_extension(metadata['file'])
         
-        # Enhance document with language context
-        enhanced_doc = enhance_code_document(doc, language, metadata)
-        
-        # Chunk the enhanced document
-        chunks = chunk_text(enhanced_doc, max_length=400, overlap=50)
-        processed_docs.extend(chunks)
-        doc_chunk_mapping.extend([doc_idx] * len(chunks))
-    
-    print(f"Enhanced documents with language context. Generating embeddings for {len(processed_docs)} chunks...")
-    
-    # Generate embeddings in batches
-    all_embeddings = []
-    for i in tqdm(range(0, len(processed_docs), batch_size), desc="Embedding"):
-        batch = processed_docs[i:i + batch_size]
-        batch_embeddings = model.encode(batch, convert_to_numpy=True, show_progress_bar=False)
-        all_embeddings.append(batch_embeddings)
-    
-    # Concatenate all embeddings
-    chunk_embeddings = np.vstack(all_embeddings)
-    
-    # Aggregate chunk embeddings back to document embeddings
-    doc_embeddings = []
-    for doc_idx in range(len(docs)):
-        chunk_indices = [i for i, mapped_doc_idx in enumerate(doc_chunk_mapping) if mapped_doc_idx == doc_idx]
-        
-        if len(chunk_indices) == 1:
-            doc_embeddings.append(chunk_embeddings[chunk_indices[0]])
-        else:
-            # Multiple chunks - use mean pooling
-            chunk_vecs = chunk_embeddings[chunk_indices]
-            doc_embedding = np.mean(chunk_vecs, axis=0)
-            doc_embeddings.append(doc_embedding)
-    
-    embeddings = np.array(doc_embeddings)
-    print(f"Generated {embeddings.shape[0]} embeddings with dimension {embeddings.shape[1]} for multiple programming languages")
+        languages.append(language)
+        metadatas.append(metadata)
+    
+    # One encode call per window: sentence-transformers batches internally,
+    # sorting by length so batches carry little padding
+    encode = partial(model.encode, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=True)
+    # A CUDA model's chunk embeddings stay on the GPU and are pooled there
+    on_device = EMBEDDER_BACKEND != "onnx" and get_device().startswith("cuda")
+    
+    def embed_chunk_lists(chunk_lists: List[List[str]]) -> np.ndarray:
+        """Encode documents given as chunk lists and mean-pool each into one vector."""
+        flat_chunks = [chunk for chunks in chunk_lists for chunk in chunks]
+        counts = np.fromiter(map(len, chunk_lists), dtype=np.int64, count=len(chunk_lists))
+        if on_device:
+            return _mean_pool_on_device(
+                encode(flat_chunks, convert_to_numpy=False, convert_to_tensor=True),
+                np.repeat(np.arange(len(counts)), counts),
+                counts
+            )
+        return _mean_pool_chunks(encode(flat_chunks), counts)
+    
+    if use_cache:
+        # Pooled document vectors are cached, keyed by the document's chunks,
+        # so only documents whose prepared text changed hit the model
+        from .embedder_cache import embed_with_cache
+    
+    # Enhancing and chunking is pure-Python string work; spread large corpora
+    # over processes. Small ones use a single background thread, which still
+    # lets preparation overlap with encoding.
+    if len(docs) >= PARALLEL_PREPARE_MIN_DOCS:
+        parts = (os.cpu_count() or 1) * 4
+        executor = _get_prepare_pool()
+    else:
+        parts = 1
+        executor = ThreadPoolExecutor(max_workers=1)
+    
+    def prepare(window: slice) -> List[Future]:
+        # Split the window so a process pool works on the parts in parallel
+        start, stop = window.start, min(window.stop, len(docs))
+        step = max(1, -(-(stop - start) // parts))
+        return [
+            executor.submit(_prepare_documents, docs[k:k + step], languages[k:k + step], metadatas[k:k + step])
+            for k in range(start, stop, step)
+        ]
+    
+    # Documents are prepared, encoded and pooled one window at a time, so only
+    # one window's chunk strings and chunk embeddings are held in memory. The
+    # next window is prepared while the current one is being encoded.
+    windows = [slice(start, start + EMBED_DOC_WINDOW) for start in range(0, len(docs), EMBED_DOC_WINDOW)]
+    embeddings = None
+    total_chunks = 0
+    pending = []
+    try:
+        pending = prepare(windows[0])
+        for window_idx, window in enumerate(windows):
+            chunk_lists = [chunks for future in pending for chunks in future.result()]
+            total_chunks += sum(map(len, chunk_lists))
+            
+            if window_idx + 1 < len(windows):
+                pending = prepare(windows[window_idx + 1])
+            
+            if use_cache:
+                # Each document is keyed by its chunks joined with a record separator
+                chunks_by_key = {"\x1e".join(chunks): chunks for chunks in chunk_lists}
+                doc_vectors = embed_with_cache(
+                    list(map("\x1e".join, chunk_lists)),
+                    lambda keys: embed_chunk_lists([chunks_by_key[key] for key in keys]),
+                    model_name
+                )
+            else:
+                doc_vectors = embed_chunk_lists(chunk_lists)
+            
+            if embeddings is None:
+                embeddings = np.empty((len(docs), doc_vectors.shape[1]), dtype=np.float32)
+            embeddings[window] = doc_vectors
+    finally:
+        # The shared process pool stays up; only this call's leftover work is dropped
+        for future in pending:
+            future.cancel()
+        if isinstance(executor, ThreadPoolExecutor):
+            executor.shutdown()
+    
+    print(f"Generated {embeddings.shape[0]} embeddings with dimension {embeddings.shape[1]} from {total_chunks} chunks for multiple programming languages")
     
     return embeddings
 
+# Per-language pattern for the line holding a component's signature
+_JS_SIGNATURE_RE = re.compile(r'^.*(?:function|=>).*$', re.M)
+_C_SIGNATURE_RE = re.compile(r'^(?=.*(?:class|struct|template))(?=.*\{).*$', re.M)
+_SIGNATURE_PATTERNS = {
+    'python': re.compile(r'^\s*def (?=.*\S).*$', re.M),
+    'javascript': _JS_SIGNATURE_RE,
+    'typescript': _JS_SIGNATURE_RE,
+    'java': re.compile(r'^(?=.*(?:public|private|protected))(?=.*\().*$', re.M),
+    'go': re.compile(r'^\s*func (?=.*\S).*$', re.M),
+    'rust': re.compile(r'^\s*fn (?=.*\S).*$', re.M),
+    'cpp': _C_SIGNATURE_RE,
+    'c': _C_SIGNATURE_RE,
+}
+
 def create_multilingual_document(node: Dict) -> str:
     """
     Create an enhanced document from a code node with multi-language awareness.
@@ -283,43 +540,13 @@ def create_multilingual_document(node: Dict) -> str:
     code = node.get('code', '')
     signature = ""
     
-    # Language-specific signature extraction
-    if language == 'python' and 'def ' in code:
-        lines = code.split('\n')
-        for line in lines:
-            if line.strip().startswith('def '):
-                signature = line.strip()
-                break
-    elif language in ['javascript', 'typescript'] and 'function' in code:
-        lines = code.split('\n')
-        for line in lines:
-            if 'function' in line or '=>' in line:
-                signature = line.strip()
-                break
-    elif language == 'java' and any(keyword in code for keyword in ['public', 'private', 'protected']):
-        lines = code.split('\n')
-        for line in lines:
-            if any(keyword in line for keyword in ['public', 'private', 'protected']) and '(' in line:
-                signature = line.strip()
-                break
-    elif language == 'go' and 'func ' in code:
-        lines = code.split('\n')
-        for line in lines:
-            if line.strip().startswith('func '):
-                signature = line.strip()
-                break
-    elif language == 'rust' and 'fn ' in code:
-        lines = code.split('\n')
-        for line in lines:
-            if line.strip().startswith('fn '):
-                signature = line.strip()
-                break
-    elif language in ['cpp', 'c'] and any(keyword in code for keyword in ['class', 'struct', 'template']):
-        lines = code.split('\n')
-        for line in lines:
-            if any(keyword in line for keyword in ['class', 'struct', 'template']) and '{' in line:
-                signature = line.strip()
-                break
+    # Language-specific signature extraction: the first matching line
+    pattern = _SIGNATURE_PATTERNS.get(language)
+    # Arrow-function lines only count in code that also uses the function keyword
+    if pattern is not None and (language not in ('javascript', 'typescript') or 'function' in code):
+        match = pattern.search(code)
+        if match:
+            signature = match.group(0).strip()
     
     # Create comprehensive document
     doc_parts = [
@@ -348,6 +575,21 @@ def create_multilingual_document(node: Dict) -> str:
     
     return '\n'.join(doc_parts)
 
+# Output dimensions of common sentence-transformers models (by name without
+# the organization prefix)
+KNOWN_EMBEDDING_DIMENSIONS = {
+    'all-MiniLM-L6-v2': 384,
+    'all-MiniLM-L12-v2': 384,
+    'paraphrase-MiniLM-L6-v2': 384,
+    'multi-qa-MiniLM-L6-cos-v1': 384,
+    'all-mpnet-base-v2': 768,
+    'multi-qa-mpnet-base-dot-v1': 768,
+    'all-distilroberta-v1': 768,
+    'bge-small-en-v1.5': 384,
+    'bge-base-en-v1.5': 768,
+    'bge-large-en-v1.5': 1024,
+}
+
 def get_embedding_dimension(model_name: str = MODEL_NAME) -> int:
     """
     Get the embedding dimension for a given model.
@@ -358,7 +600,11 @@ def get_embedding_dimension(model_name: str = MODEL_NAME) -> int:
     Returns:
         int: Embedding dimension
     """
-    model = SentenceTransformer(model_name)
+    # Known models answer without loading (and keeping) hundreds of MB of weights
+    dimension = KNOWN_EMBEDDING_DIMENSIONS.get(model_name.rpartition('/')[2])
+    if dimension is not None:
+        return dimension
+    model = _get_model(model_name)
     return model.get_sentence_embedding_dimension()
 
 def embed_documents_simple(docs: List[str], model_name: str = MODEL_NAME, batch_size: int = 64) -> np.ndarray:
@@ -376,12 +622,61 @@ def embed_documents_simple(docs: List[str], model_name: str = MODEL_NAME, batch_
     if not docs:
         return np.array([])
     
-    model = SentenceTransformer(model_name)
+    return _get_model(model_name).encode(
+        docs,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        show_progress_bar=True
+    )
+
+def embed_documents_sorted(docs: List[str], model_name: str = MODEL_NAME, batch_size: int = 1024) -> np.ndarray:
+    """
+    Embed documents in one encode call with length-sorted batches.
+    
+    Sorting by length keeps documents of similar size in the same batch, so
+    little compute is spent on padding tokens; the inverse permutation
+    restores the input order so rows still line up with their nodes.
+    
+    Args:
+        docs (List[str]): List of documents to embed
+        model_name (str): Name of the sentence-transformers model
+        batch_size (int): Batch size for processing
+    
+    Returns:
+        np.ndarray: Array of embeddings with shape (len(docs), embedding_dim)
+    """
+    if not docs:
+        return np.array([])
+    
+    order = np.argsort([len(doc) for doc in docs], kind="stable")
+    embeddings = _get_model(model_name).encode(
+        [docs[i] for i in order],
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        show_progress_bar=False
+    )
+    # Gathering rows back into input order yields one contiguous float32 block,
+    # which the Qdrant upload paths consume without further copies
+    return np.ascontiguousarray(embeddings[np.argsort(order)], dtype=np.float32)
+
+def pairwise_cosine(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Compute the full cosine-similarity matrix for a set of embeddings.
+    
+    Normalizes once and uses a single matrix multiply (one BLAS GEMM call)
+    instead of looping over pairs with np.dot.
     
-    embeddings = []
-    for i in tqdm(range(0, len(docs), batch_size), desc="Embedding"):
-        batch = docs[i:i+batch_size]
-        vecs = model.encode(batch, convert_to_numpy=True, show_progress_bar=False)
-        embeddings.extend(vecs)
+    Args:
+        embeddings (np.ndarray): Array of shape (n, embedding_dim)
     
-    return np.array(embeddings)
+    Returns:
+        np.ndarray: Array of shape (n, n) with cosine similarities
+    """
+    embs = np.array(embeddings, dtype=np.float32, order='C')  # contiguous copy, safe to normalize in place
+    if embs.size == 0:
+        return np.zeros((len(embs), len(embs)), dtype=np.float32)
+    
+    norms = np.linalg.norm(embs, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0  # zero vectors (e.g. edge placeholders) stay zero
+    embs /= norms
+    return embs @ embs.T
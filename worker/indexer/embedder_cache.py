@@ -0,0 +1,131 @@
+# backend/worker/indexer/embedder_cache.py
+import os
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .embedder import embedding_config_key
+
+# Default location of the persistent embedding cache
+DEFAULT_CACHE_PATH = Path(os.getenv("REPOCANVAS_CACHE_DIR", Path.home() / ".cache" / "repocanvas")) / "embeddings.sqlite3"
+
+def content_hash(text: str) -> str:
+    """Stable hash of a document's text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+class EmbeddingCache:
+    """
+    Persistent document-embedding cache keyed by (content hash, model key).
+
+    Vectors are stored as float32 blobs in a small sqlite table, so
+    re-indexing a repository only runs the model on documents whose text
+    changed. Entries of different models never mix; changing the model
+    simply misses. embed_with_cache stores the model key from
+    embedding_config_key, so switching backend or precision misses too.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_CACHE_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " hash TEXT NOT NULL,"
+            " model_name TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (hash, model_name))"
+        )
+        self._conn.commit()
+
+    def get_many(self, hashes: List[str], model_name: str) -> Dict[str, np.ndarray]:
+        """Return the cached vectors for the given hashes (misses are absent)."""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        # Stay under sqlite's bound-parameter limit
+        with self._lock:
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model_name = ? AND hash IN ({placeholders})",
+                    [model_name, *chunk]
+                )
+                for digest, blob in rows:
+                    found[digest] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, hashes: List[str], vectors: np.ndarray, model_name: str) -> None:
+        """Store vectors for the given hashes."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, model_name, vector) VALUES (?, ?, ?)",
+                [(digest, model_name, vector.tobytes()) for digest, vector in zip(hashes, vectors)]
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def embed_with_cache(
+    documents: List[str],
+    embed_fn: Callable[[List[str]], np.ndarray],
+    model_name: str,
+    cache: Optional[EmbeddingCache] = None
+) -> np.ndarray:
+    """
+    Embed documents, running embed_fn only on documents not seen before.
+
+    Args:
+        documents (List[str]): Documents to embed
+        embed_fn (Callable): Embeds a list of documents into an (n, dim) array
+        model_name (str): Model name; with the embedder's backend and
+            precision it forms the cache key
+        cache (EmbeddingCache): Cache to use (default: the process-wide cache)
+
+    Returns:
+        np.ndarray: Embeddings in the original document order
+    """
+    if not documents:
+        return np.array([])
+
+    cache = cache or get_default_cache()
+    model_key = embedding_config_key(model_name)
+    hashes = [content_hash(doc) for doc in documents]
+    cached = cache.get_many(hashes, model_key)
+
+    # Embed each distinct missing document once, in a single call
+    missing = {}
+    for digest, doc in zip(hashes, documents):
+        if digest not in cached and digest not in missing:
+            missing[digest] = doc
+
+    if missing:
+        new_vectors = np.asarray(embed_fn(list(missing.values())), dtype=np.float32)
+        cache.put_many(list(missing), new_vectors, model_key)
+        cached.update(zip(missing, new_vectors))
+
+    print(f"Embedding cache: {len(missing)} of {len(documents)} documents embedded, rest reused")
+    # Fill one pre-sized array row by row instead of stacking a list of vectors
+    dim = len(next(iter(cached.values())))
+    embeddings = np.empty((len(documents), dim), dtype=np.float32)
+    for row, digest in enumerate(hashes):
+        embeddings[row] = cached[digest]
+    return embeddings
+
+_default_cache: Optional[EmbeddingCache] = None
+_default_cache_lock = threading.Lock()
+
+def get_default_cache() -> EmbeddingCache:
+    """Return the process-wide cache at DEFAULT_CACHE_PATH, opening it on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingCache()
+        return _default_cache
@@ -0,0 +1,93 @@
+# backend/worker/indexer/onnx_embedder.py
+"""
+ONNX Runtime backend for sentence embeddings.
+
+Run the worker with EMBEDDER_BACKEND=onnx. If ONNX_MODEL_DIR holds no
+export yet, the model is exported there on first load (plain FP32, the
+usual choice for CPU). For a GPU, export an optimized FP16 model up front
+instead:
+
+    optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 \
+        --task feature-extraction --optimize O4 --device cuda onnx_model/
+
+O4 produces FP16 weights (GPU only); use O3 for CPU.
+"""
+import os
+import numpy as np
+from typing import List
+
+# Directory holding the exported ONNX model and tokenizer files
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "onnx_model")
+
+def _default_provider() -> str:
+    import onnxruntime
+    if "CUDAExecutionProvider" in onnxruntime.get_available_providers():
+        return "CUDAExecutionProvider"
+    return "CPUExecutionProvider"
+
+class OnnxSentenceEncoder:
+    """
+    Drop-in replacement for the parts of SentenceTransformer used by the
+    embedder (encode, get_sentence_embedding_dimension, eval), running the
+    transformer through ONNX Runtime and mean-pooling token embeddings the
+    same way sentence-transformers does.
+    """
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, provider: str = None, max_length: int = 256,
+                 model_name: str = None):
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        provider = provider or _default_provider()
+
+        if model_name and not os.path.exists(os.path.join(model_dir, "model.onnx")):
+            # No export yet: convert the hub model once and keep it for later loads
+            hub_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+            print(f"Exporting {hub_name} to ONNX in: {model_dir}")
+            model = ORTModelForFeatureExtraction.from_pretrained(hub_name, export=True)
+            model.save_pretrained(model_dir)
+            AutoTokenizer.from_pretrained(hub_name).save_pretrained(model_dir)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_dir, provider=provider, session_options=session_options
+        )
+        self.max_length = max_length
+        self._dimension = int(self.model.config.hidden_size)
+
+    def eval(self) -> "OnnxSentenceEncoder":
+        return self
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dimension
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        inputs = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np"
+        )
+        token_embeddings = np.asarray(self.model(**inputs).last_hidden_state, dtype=np.float32)
+
+        # Mean pooling over non-padding tokens
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        return summed / counts
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        if not texts:
+            return np.empty((0, self._dimension), dtype=np.float32)
+
+        embeddings = np.concatenate([
+            self._encode_batch(texts[i:i + batch_size])
+            for i in range(0, len(texts), batch_size)
+        ])
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
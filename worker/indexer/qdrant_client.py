@@ -1,15 +1,43 @@
 # backend/worker/indexer/qdrant_client.py
 from qdrant_client import QdrantClient
-from qdrant_client.models import VectorParams, PointStruct, Distance
+from qdrant_client.models import (
+    VectorParams, Batch, Distance, OptimizersConfigDiff, HnswConfigDiff,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType
+)
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+import os
+from itertools import chain
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 import json
 
+# Number of leading code lines kept in each node's code_preview payload
+CODE_PREVIEW_LINES = 12
+
+# Qdrant's default indexing threshold, restored after a bulk upload
+DEFAULT_INDEXING_THRESHOLD = 20000
+
+# Ingest is dominated by encoding float vectors, which gRPC does in protobuf
+# over one persistent HTTP/2 connection instead of JSON. Callers should build
+# one client with QdrantClient(url=..., prefer_grpc=True, grpc_port=6334,
+# timeout=60) and share it for create/upsert/search so the connection is reused.
+_rest_clients_warned = set()
+
+def _warn_if_rest(client: QdrantClient) -> None:
+    """Point out, once per client, that bulk writes are going over REST."""
+    remote = getattr(client, '_client', None)
+    if getattr(remote, '_prefer_grpc', True) or id(client) in _rest_clients_warned:
+        return
+    _rest_clients_warned.add(id(client))
+    print("⚠️  Qdrant client uses REST; construct it with prefer_grpc=True for faster upserts")
+
 def create_or_recreate_collection(
     client: QdrantClient, 
     name: str, 
     vector_size: int,
-    distance: str = "Cosine"
+    distance: str = "Cosine",
+    scalar_quantization: bool = False,
+    hnsw_m: Optional[int] = None,
+    hnsw_ef_construct: Optional[int] = None
 ) -> bool:
     """
     Create or recreate a Qdrant collection with specified vector size.
@@ -19,15 +47,32 @@ def create_or_recreate_collection(
         name (str): Name of the collection
         vector_size (int): Dimension of the vectors
         distance (str): Distance metric to use ("Cosine", "Dot", "Euclid")
+        scalar_quantization (bool): Also keep int8-quantized copies of the
+            vectors in RAM (4x smaller, faster search; originals stay on disk
+            for rescoring)
+        hnsw_m (int): HNSW graph degree (Qdrant default if None)
+        hnsw_ef_construct (int): HNSW build-time candidate list size
+            (Qdrant default if None)
     
     Returns:
         bool: True if successful
     """
+    quantization_config = None
+    if scalar_quantization:
+        quantization_config = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    hnsw_config = None
+    if hnsw_m is not None or hnsw_ef_construct is not None:
+        hnsw_config = HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct)
+    
     try:
         print(f"Creating/recreating collection '{name}' with vector size {vector_size}...")
         client.recreate_collection(
             collection_name=name, 
-            vectors_config=VectorParams(size=vector_size, distance=distance)
+            vectors_config=VectorParams(size=vector_size, distance=distance),
+            quantization_config=quantization_config,
+            hnsw_config=hnsw_config
         )
         print(f"✅ Collection '{name}' created successfully")
         return True
@@ -36,7 +81,9 @@ def create_or_recreate_collection(
             # Fallback to create if recreate fails
             client.create_collection(
                 collection_name=name, 
-                vectors_config=VectorParams(size=vector_size, distance=distance)
+                vectors_config=VectorParams(size=vector_size, distance=distance),
+                quantization_config=quantization_config,
+                hnsw_config=hnsw_config
             )
             print(f"✅ Collection '{name}' created successfully (fallback)")
             return True
@@ -67,45 +114,131 @@ def upsert_embeddings(
     if len(embeddings) != len(payloads):
         raise ValueError(f"Embeddings ({len(embeddings)}) and payloads ({len(payloads)}) must have same length")
     
-    points = []
-    id_to_node_map = {}
+    # One contiguous float32 buffer; each batch is converted with a single
+    # bulk .tolist() instead of one conversion per point
+    vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+    point_ids = range(start_id, start_id + len(payloads))
+    id_to_node_map = {
+        point_id: payload.get('node_id', f'unknown_{i}')
+        for i, (point_id, payload) in enumerate(zip(point_ids, payloads))
+    }
     
-    print(f"Preparing {len(embeddings)} points for upsert...")
-    
-    for i, (embedding, payload) in enumerate(zip(embeddings, payloads)):
-        point_id = start_id + i
-        node_id = payload.get('node_id', f'unknown_{i}')
-        
-        # Store the mapping
-        id_to_node_map[point_id] = node_id
-        
-        # Create point structure
-        point = PointStruct(
-            id=point_id, 
-            vector=embedding.tolist(), 
-            payload=payload
-        )
-        points.append(point)
+    _warn_if_rest(client)
+    print(f"Preparing {len(payloads)} points for upsert...")
     
     try:
         # Upsert points in batches to avoid memory issues
         batch_size = 100
-        total_batches = (len(points) + batch_size - 1) // batch_size
+        total_batches = (len(payloads) + batch_size - 1) // batch_size
         
-        print(f"Upserting {len(points)} points in {total_batches} batches...")
+        print(f"Upserting {len(payloads)} points in {total_batches} batches...")
         
-        for i in range(0, len(points), batch_size):
-            batch = points[i:i + batch_size]
+        for i in range(0, len(payloads), batch_size):
+            # Column-oriented batch: one model per request instead of one PointStruct per point
+            batch = Batch(
+                ids=list(point_ids[i:i + batch_size]),
+                vectors=vectors[i:i + batch_size].tolist(),
+                payloads=payloads[i:i + batch_size]
+            )
             client.upsert(collection_name=collection_name, points=batch)
             print(f"  Batch {i//batch_size + 1}/{total_batches} completed")
         
-        print(f"✅ Successfully upserted {len(points)} points")
+        print(f"✅ Successfully upserted {len(payloads)} points")
         return id_to_node_map
         
     except Exception as e:
         print(f"❌ Failed to upsert embeddings: {e}")
         return {}
 
+def _bulk_upload(
+    client: QdrantClient,
+    collection_name: str,
+    vectors: np.ndarray,
+    payload: Iterable[Dict[str, Any]],
+    ids: Iterable[int],
+    batch_size: int,
+    parallel: int
+) -> None:
+    """upload_collection with HNSW indexing paused until every batch is in."""
+    client.update_collection(
+        collection_name=collection_name,
+        optimizer_config=OptimizersConfigDiff(indexing_threshold=0)
+    )
+    try:
+        client.upload_collection(
+            collection_name=collection_name,
+            vectors=vectors,
+            payload=payload,
+            ids=ids,
+            batch_size=batch_size,
+            parallel=parallel
+        )
+    finally:
+        client.update_collection(
+            collection_name=collection_name,
+            optimizer_config=OptimizersConfigDiff(indexing_threshold=DEFAULT_INDEXING_THRESHOLD)
+        )
+
+def upload_embeddings(
+    client: QdrantClient,
+    collection_name: str,
+    embeddings: np.ndarray,
+    payloads: List[Dict[str, Any]],
+    start_id: int = 1,
+    batch_size: int = 512,
+    parallel: Optional[int] = None
+) -> Dict[int, str]:
+    """
+    Bulk-load embeddings with Qdrant's parallel batched uploader.
+    
+    HNSW indexing is switched off for the duration of the upload and
+    restored afterwards, so the collection is indexed once at the end
+    instead of continuously while points stream in.
+    
+    Args:
+        client (QdrantClient): Qdrant client instance
+        collection_name (str): Name of the collection
+        embeddings (np.ndarray): Array of embeddings
+        payloads (List[Dict]): List of payload dictionaries
+        start_id (int): Starting ID for points
+        batch_size (int): Points sent per request
+        parallel (int): Number of upload workers (default: min(8, cpu count))
+    
+    Returns:
+        Dict[int, str]: Mapping from point ID to node_id
+    """
+    if len(embeddings) != len(payloads):
+        raise ValueError(f"Embeddings ({len(embeddings)}) and payloads ({len(payloads)}) must have same length")
+    
+    if parallel is None:
+        parallel = min(8, os.cpu_count() or 1)
+    
+    vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+    point_ids = range(start_id, start_id + len(payloads))
+    
+    _warn_if_rest(client)
+    print(f"Uploading {len(payloads)} points (batch_size={batch_size}, parallel={parallel})...")
+    
+    try:
+        _bulk_upload(client, collection_name, vectors, payloads, point_ids, batch_size, parallel)
+        
+        print(f"✅ Successfully uploaded {len(payloads)} points")
+        return {
+            point_id: payload.get('node_id', f'unknown_{i}')
+            for i, (point_id, payload) in enumerate(zip(point_ids, payloads))
+        }
+        
+    except Exception as e:
+        print(f"❌ Failed to upload embeddings: {e}")
+        return {}
+
+def _is_function_node(node: Dict[str, Any]) -> bool:
+    """Check the node kind tagged by the parser, falling back to the id prefix for older graphs."""
+    node_type = node.get('type')
+    if node_type:
+        return node_type == 'FUNCTION'
+    return node.get('id', '').startswith('function:')
+
 def create_node_payloads(nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Create payload dictionaries for nodes to store in Qdrant.
@@ -114,7 +247,7 @@ def create_node_payloads(nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         nodes (List[Dict]): List of parsed node dictionaries
     
     Returns:
-        List[Dict]: List of payload dictionaries with node_id, name, file, start_line, snippet
+        List[Dict]: List of payload dictionaries with node_id, name, file, start_line, snippet, code_preview
     """
     payloads = []
     
@@ -132,12 +265,15 @@ def create_node_payloads(nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             'start_line': int(node.get('start_line', 0)),
             'end_line': int(node.get('end_line', 0)),
             'snippet': snippet,
+            # First lines of the snippet, precomputed once so the summarizer
+            # does not re-split the code on every query
+            'code_preview': "\n".join(snippet.splitlines()[:CODE_PREVIEW_LINES]),
             'doc': node.get('doc', ''),
             'loc': int(node.get('loc', 0)),
             'cyclomatic': int(node.get('cyclomatic', 0)),
             'num_calls_in': int(node.get('num_calls_in', 0)),
             'num_calls_out': int(node.get('num_calls_out', 0)),
-            'node_type': 'function' if 'function:' in node.get('id', '') else 'class'
+            'node_type': 'function' if _is_function_node(node) else 'class'
         }
         
         payloads.append(payload)
@@ -168,80 +304,133 @@ def create_edge_payloads(edges: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     
     return payloads
 
+def upsert_node_batch(
+    client: QdrantClient,
+    collection_name: str,
+    nodes: List[Dict[str, Any]],
+    embeddings: np.ndarray,
+    start_id: int = 0,
+    batch_size: int = 100
+) -> Dict[str, int]:
+    """
+    Upsert one window of nodes with their embeddings.
+    
+    Args:
+        client: Qdrant client instance
+        collection_name: Name of the collection
+        nodes: List of node dictionaries
+        embeddings: Embeddings for exactly these nodes
+        start_id: Point ID of the first node in the window
+        batch_size: Points sent per upsert request
+    
+    Returns:
+        Dict mapping node IDs to Qdrant point IDs
+    """
+    payloads = create_node_payloads(nodes)
+    vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+    id_to_node_map = {}
+    
+    for i in range(0, len(nodes), batch_size):
+        batch_nodes = nodes[i:i + batch_size]
+        batch_ids = list(range(start_id + i, start_id + i + len(batch_nodes)))
+        client.upsert(
+            collection_name=collection_name,
+            points=Batch(
+                ids=batch_ids,
+                vectors=vectors[i:i + batch_size].tolist(),
+                payloads=payloads[i:i + batch_size]
+            )
+        )
+        for node, point_id in zip(batch_nodes, batch_ids):
+            id_to_node_map[node.get('id', '')] = point_id
+    
+    return id_to_node_map
+
+def upsert_edge_points(
+    client: QdrantClient,
+    collection_name: str,
+    edges: List[Dict[str, Any]],
+    vector_dim: int,
+    start_id: int,
+    batch_size: int = 100
+) -> int:
+    """
+    Upsert edges as zero-vector points carrying the edge payload.
+    
+    Args:
+        client: Qdrant client instance
+        collection_name: Name of the collection
+        edges: List of edge dictionaries
+        vector_dim: Dimension of the collection's vectors
+        start_id: Point ID of the first edge (after all node IDs)
+        batch_size: Points sent per upsert request
+    
+    Returns:
+        int: Number of edge points written
+    """
+    edge_payloads = create_edge_payloads(edges)
+    # Every edge point shares the same zero vector; build the batch's vector
+    # list once and only slice it for a short final batch
+    zero_vectors = [[0.0] * vector_dim] * batch_size
+    
+    for i in range(0, len(edge_payloads), batch_size):
+        batch_payloads = edge_payloads[i:i + batch_size]
+        client.upsert(
+            collection_name=collection_name,
+            points=Batch(
+                ids=list(range(start_id + i, start_id + i + len(batch_payloads))),
+                vectors=zero_vectors if len(batch_payloads) == batch_size else zero_vectors[:len(batch_payloads)],
+                payloads=batch_payloads
+            )
+        )
+    
+    return len(edge_payloads)
+
 def upsert_graph_data(
     client: QdrantClient,
     collection_name: str,
     nodes: List[Dict[str, Any]],
     edges: List[Dict[str, Any]],
-    embeddings: np.ndarray
-) -> Dict[str, str]:
+    embeddings: np.ndarray,
+    batch_size: int = 128,
+    parallel: Optional[int] = None
+) -> Dict[str, int]:
     """
     Upsert both nodes and edges into the same Qdrant collection.
     Nodes get real embeddings, edges get zero vectors.
     
+    Nodes and edges go through a single parallel upload_collection call
+    instead of separate sequential upserts.
+    
     Args:
         client: Qdrant client instance
         collection_name: Name of the collection
         nodes: List of node dictionaries
         edges: List of edge dictionaries  
         embeddings: Node embeddings (nodes only)
+        batch_size: Points sent per request
+        parallel: Number of upload workers (default: half the cpu count, at least 2)
     
     Returns:
         Dict mapping node IDs to Qdrant point IDs
     """
+    if parallel is None:
+        parallel = max(2, (os.cpu_count() or 1) // 2)
+    
     try:
         print(f"📊 Upserting graph data: {len(nodes)} nodes, {len(edges)} edges")
+        _warn_if_rest(client)
         
-        # Create payloads for nodes and edges
-        node_payloads = create_node_payloads(nodes)
-        edge_payloads = create_edge_payloads(edges)
-        
-        # Get vector dimension from embeddings
-        vector_dim = embeddings.shape[1] if len(embeddings.shape) > 1 else len(embeddings[0])
+        node_vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        vector_dim = node_vectors.shape[1]
+        # Edge points follow the nodes, so edge IDs start after node IDs
+        vectors = np.concatenate([node_vectors, np.zeros((len(edges), vector_dim), dtype=np.float32)])
+        payload = chain(create_node_payloads(nodes), create_edge_payloads(edges))
         
-        # Create points for nodes (with real embeddings)
-        node_points = []
-        id_to_node_map = {}
-        
-        for i, (node, payload) in enumerate(zip(nodes, node_payloads)):
-            point_id = i  # Use integer ID for Qdrant
-            point = PointStruct(
-                id=point_id,
-                vector=embeddings[i].tolist(),
-                payload=payload
-            )
-            node_points.append(point)
-            id_to_node_map[node.get('id', '')] = point_id
-        
-        # Create points for edges (with zero vectors)
-        edge_points = []
-        zero_vector = [0.0] * vector_dim
-        
-        # Start edge IDs after node IDs to avoid conflicts
-        edge_id_offset = len(nodes)
-        
-        for i, (edge, payload) in enumerate(zip(edges, edge_payloads)):
-            point_id = edge_id_offset + i  # Use integer ID for Qdrant
-            point = PointStruct(
-                id=point_id,
-                vector=zero_vector,  # Zero vector for edges
-                payload=payload
-            )
-            edge_points.append(point)
-        
-        # Combine all points
-        all_points = node_points + edge_points
-        
-        # Batch upsert
-        batch_size = 100
-        total_batches = (len(all_points) + batch_size - 1) // batch_size
-        
-        for i in range(0, len(all_points), batch_size):
-            batch = all_points[i:i+batch_size]
-            client.upsert(collection_name=collection_name, points=batch)
-            print(f"  Batch {i//batch_size + 1}/{total_batches} completed")
+        _bulk_upload(client, collection_name, vectors, payload, range(len(vectors)), batch_size, parallel)
         
-        print(f"✅ Successfully upserted {len(node_points)} nodes and {len(edge_points)} edges")
+        id_to_node_map = {node.get('id', ''): point_id for point_id, node in enumerate(nodes)}
+        print(f"✅ Successfully upserted {len(id_to_node_map)} nodes and {len(edges)} edges")
         return id_to_node_map
         
     except Exception as e:
@@ -0,0 +1,99 @@
+# backend/worker/indexer/query_batcher.py
+import asyncio
+import logging
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class QueryBatcher:
+    """
+    Coalesce concurrent query encodings into shared encoder calls.
+
+    Each caller awaits encode(text). A background consumer collects the
+    queries that arrive within max_wait_ms (up to max_batch), sorts them by
+    length so similar-sized inputs are padded together, encodes them in a
+    single call off the event loop and hands each caller its own vector.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_batch: int = 64, max_wait_ms: float = 8.0):
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the consumer task on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        """Cancel the consumer task and fail any queries still waiting."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        while self._queue and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Query batcher stopped"))
+
+    async def encode(self, text: str) -> np.ndarray:
+        """Encode one query, sharing the encoder call with concurrent queries."""
+        if not self.running:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _consume(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+
+            # Length-sorted so padding inside the encoder stays minimal
+            batch.sort(key=lambda item: len(item[0]))
+            texts = [text for text, _ in batch]
+
+            try:
+                vectors = await asyncio.to_thread(self.encode_fn, texts)
+            except Exception as e:
+                logger.error(f"Batched query encoding failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            if len(batch) > 1:
+                logger.debug(f"Encoded {len(batch)} queries in one batch")
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
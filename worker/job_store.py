@@ -0,0 +1,195 @@
+# backend/worker/job_store.py
+import os
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import orjson
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # redis is optional; without it jobs stay process-local
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+# Completed/failed jobs expire from Redis after this many seconds
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", str(24 * 3600)))
+# The in-memory store forgets the least recently updated jobs past this count
+MAX_TRACKED_JOBS = int(os.getenv("MAX_TRACKED_JOBS", "10000"))
+
+class JobStore:
+    """
+    Tracks background job state (status fields) and job results.
+
+    By default both live in process-local LRU dicts capped at max_jobs
+    entries (oldest-updated jobs are forgotten first). When a Redis client is
+    given, every job is kept in Redis instead, so any worker process behind
+    the load balancer can answer /status and /jobs for it:
+
+        repocanvas:job:{id}          hash of status fields (orjson values)
+        repocanvas:job:{id}:result   orjson-encoded result
+        repocanvas:jobs              set of known job ids
+    """
+
+    KEY_PREFIX = "repocanvas:job:"
+    INDEX_KEY = "repocanvas:jobs"
+
+    def __init__(self, redis_client=None, ttl: int = JOB_TTL_SECONDS, max_jobs: int = MAX_TRACKED_JOBS):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.active_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.job_results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "JobStore":
+        """Use Redis when REDIS_URL is set and the redis package is installed."""
+        redis_url = os.getenv("REDIS_URL")
+        if not redis_url:
+            return cls()
+        if redis_asyncio is None:
+            logger.warning("REDIS_URL is set but the redis package is not installed; using in-memory job store")
+            return cls()
+        logger.info(f"Using Redis job store at {redis_url}")
+        return cls(redis_asyncio.from_url(redis_url))
+
+    @staticmethod
+    def _dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=str)
+
+    def _touch(self, job_id: str) -> None:
+        """Mark a job as most recently used and evict the oldest past max_jobs."""
+        for jobs in (self.active_jobs, self.job_results):
+            if job_id in jobs:
+                jobs.move_to_end(job_id)
+            while len(jobs) > self.max_jobs:
+                evicted, _ = jobs.popitem(last=False)
+                self.active_jobs.pop(evicted, None)
+                self.job_results.pop(evicted, None)
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}{job_id}"
+
+    async def create(self, job_id: str, info: Dict[str, Any]) -> None:
+        """Register a new job with its initial status fields."""
+        if self.redis is None:
+            self.active_jobs[job_id] = dict(info)
+            self._touch(job_id)
+            return
+        key = self._key(job_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping={field: self._dumps(value) for field, value in info.items()})
+            pipe.expire(key, self.ttl)
+            pipe.sadd(self.INDEX_KEY, job_id)
+            await pipe.execute()
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        """Update status fields of a running job."""
+        if self.redis is None:
+            self.active_jobs.setdefault(job_id, {}).update(fields)
+            self._touch(job_id)
+            return
+        await self.redis.hset(
+            self._key(job_id), mapping={field: self._dumps(value) for field, value in fields.items()}
+        )
+
+    async def set_result(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Store a job's final result."""
+        if self.redis is None:
+            self.job_results[job_id] = result
+            self._touch(job_id)
+            return
+        key = self._key(job_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(f"{key}:result", self._dumps(result), ex=self.ttl)
+            pipe.expire(key, self.ttl)
+            pipe.sadd(self.INDEX_KEY, job_id)
+            await pipe.execute()
+
+    @staticmethod
+    def _decode_job(fields: Dict, result: Optional[bytes]) -> Optional[Dict[str, Any]]:
+        """Merge a job's raw status hash and result, or None if both are gone."""
+        if not fields and result is None:
+            return None
+        job_info = {
+            (field.decode() if isinstance(field, bytes) else field): orjson.loads(value)
+            for field, value in fields.items()
+        }
+        if result is not None:
+            job_info.update(orjson.loads(result))
+        return job_info
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status fields merged with the result, or None for an unknown job."""
+        if self.redis is None:
+            if job_id not in self.active_jobs and job_id not in self.job_results:
+                return None
+            job_info = dict(self.active_jobs.get(job_id, {}))
+            job_info.update(self.job_results.get(job_id, {}))
+            return job_info
+
+        key = self._key(job_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(key)
+            pipe.get(f"{key}:result")
+            fields, result = await pipe.execute()
+        return self._decode_job(fields, result)
+
+    async def all(self) -> Dict[str, Dict[str, Any]]:
+        """Every tracked job, keyed by job id."""
+        if self.redis is None:
+            # Merge without copying jobs that have no result yet
+            all_jobs = dict(self.active_jobs)
+            for job_id, result in self.job_results.items():
+                job_info = all_jobs.get(job_id)
+                all_jobs[job_id] = {**job_info, **result} if job_info else result
+            return all_jobs
+
+        job_ids = [
+            raw_id.decode() if isinstance(raw_id, bytes) else raw_id
+            for raw_id in await self.redis.smembers(self.INDEX_KEY)
+        ]
+        # One round trip for every job's status hash and result
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for job_id in job_ids:
+                key = self._key(job_id)
+                pipe.hgetall(key)
+                pipe.get(f"{key}:result")
+            replies = await pipe.execute()
+        
+        all_jobs = {}
+        expired = []
+        for job_id, fields, result in zip(job_ids, replies[::2], replies[1::2]):
+            job_info = self._decode_job(fields, result)
+            if job_info is None:
+                expired.append(job_id)
+            else:
+                all_jobs[job_id] = job_info
+        if expired:
+            await self.redis.srem(self.INDEX_KEY, *expired)
+        return all_jobs
+
+    async def delete(self, job_id: str) -> bool:
+        """Forget a job. Returns False if it was not tracked."""
+        if self.redis is None:
+            found = job_id in self.active_jobs or job_id in self.job_results
+            self.active_jobs.pop(job_id, None)
+            self.job_results.pop(job_id, None)
+            return found
+        key = self._key(job_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(key, f"{key}:result")
+            pipe.srem(self.INDEX_KEY, job_id)
+            deleted, _ = await pipe.execute()
+        return deleted > 0
+
+    async def count(self) -> int:
+        """Number of tracked jobs."""
+        if self.redis is None:
+            return len(self.active_jobs)
+        return await self.redis.scard(self.INDEX_KEY)
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.close()
@@ -3,11 +3,17 @@ Enhanced repository parsing utilities with multi-language support
 Supports Tree-sitter parsing for multiple programming languages with fallback mechanisms
 """
 
-import json
+import orjson
 import logging
 import os
 import ast
 import re
+import hashlib
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import cached_property
+from itertools import repeat
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
@@ -114,6 +120,26 @@ LANGUAGE_PARSERS = {
     'bash': {'language': 'bash', 'node_types': {'function': ['function_definition']}},
 }
 
+# Directories never walked when parsing a repository
+IGNORED_DIRS = {'.git', '__pycache__', 'node_modules', '.vscode', '.idea', 'build', 'dist', 'target'}
+
+# Repositories with fewer files are parsed sequentially (process startup costs more)
+PARALLEL_PARSE_MIN_FILES = 64
+
+CACHE_ROOT = Path(os.getenv("REPOCANVAS_CACHE_DIR", Path.home() / ".cache" / "repocanvas"))
+
+# On-disk cache of parsed graphs, keyed by a fingerprint of the parsed files
+GRAPH_CACHE_DIR = CACHE_ROOT / "graphs"
+
+# On-disk cache of per-file Python parse results, keyed by path, mtime and size
+AST_CACHE_DIR = CACHE_ROOT / "ast"
+
+# Bump when the shape of parsed nodes/edges changes. Both caches also key on
+# a hash of this file, so any parser edit invalidates entries it produced.
+PARSER_SCHEMA_VERSION = 1
+with open(__file__, 'rb') as _parser_source:
+    PARSER_VERSION = f"{PARSER_SCHEMA_VERSION}:{hashlib.sha1(_parser_source.read()).hexdigest()[:16]}"
+
 def get_file_extension(file_path: str) -> str:
     """Get file extension without the dot."""
     return os.path.splitext(file_path)[1][1:].lower()
@@ -138,7 +164,125 @@ def clone_repo(repo_url: str, output_dir: str, branch: str = "main") -> bool:
     # TODO: Implement actual git cloning
     return True
 
-def parse_repository(repo_path: str, output_file: str = None) -> Dict[str, Any]:
+def iter_source_files(repo_path: str, exclude: Optional[str] = None):
+    """
+    Yield the paths of all files parse_repository would parse.
+    
+    Args:
+        repo_path: Path to repository
+        exclude: Optional file path to skip (e.g. the graph.json being written)
+    """
+    supported_extensions = set(LANGUAGE_PARSERS.keys())
+    excluded = os.path.abspath(exclude) if exclude else None
+    
+    for root, dirs, files in os.walk(repo_path):
+        # Skip common ignore directories
+        dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+        
+        for file in files:
+            file_path = os.path.join(root, file)
+            if excluded and os.path.abspath(file_path) == excluded:
+                continue
+            extension = get_file_extension(file_path)
+            
+            # Process supported file types
+            if extension in supported_extensions or not extension:
+                yield file_path
+
+def repository_fingerprint(repo_path: str, exclude: Optional[str] = None) -> str:
+    """
+    Hash the path, size and mtime of every parseable file in a repository.
+    
+    Only stats files, so it is far cheaper than parsing and changes whenever
+    a source file is added, removed or modified, or the parser changes.
+    """
+    digest = hashlib.sha1(f"{PARSER_VERSION}\n".encode('utf-8'))
+    for file_path in sorted(iter_source_files(repo_path, exclude=exclude)):
+        stat = os.stat(file_path)
+        digest.update(f"{os.path.relpath(file_path, repo_path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def _load_cached_graph(fingerprint: str) -> Optional[Dict[str, Any]]:
+    """Return a previously parsed graph for this fingerprint, if cached."""
+    cache_file = GRAPH_CACHE_DIR / f"{fingerprint}.pkl"
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable graph cache {cache_file}: {e}")
+        return None
+
+def _store_cached_graph(fingerprint: str, graph_data: Dict[str, Any]) -> None:
+    """Persist a parsed graph under its fingerprint."""
+    try:
+        GRAPH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = GRAPH_CACHE_DIR / f"{fingerprint}.pkl.tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(graph_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, GRAPH_CACHE_DIR / f"{fingerprint}.pkl")
+    except Exception as e:
+        logger.warning(f"Failed to write graph cache: {e}")
+
+def _write_graph_file(graph_data: Dict[str, Any], output_file: str) -> None:
+    """Save graph data as graph.json."""
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    # orjson writes UTF-8 bytes directly, without building a str first
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(graph_data, option=orjson.OPT_INDENT_2))
+    logger.info(f"Saved graph to {output_file}")
+
+def _ast_cache_path(file_path: str, repo_root: str) -> Path:
+    stat = os.stat(file_path)
+    key = (f"{PARSER_VERSION}\0{os.path.abspath(file_path)}\0{os.path.relpath(file_path, repo_root)}"
+           f"\0{stat.st_mtime_ns}\0{stat.st_size}")
+    return AST_CACHE_DIR / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.pkl"
+
+def parse_file_cached(file_path: str, repo_root: str) -> List[Dict[str, Any]]:
+    """
+    parse_file_basic with an on-disk cache for Python files.
+    
+    Unchanged files (same path, mtime and size) reuse the node dicts from
+    their last parse instead of being re-read and re-parsed. Other file
+    types are cheap to process and are not cached.
+    """
+    if get_file_extension(file_path) != 'py':
+        return parse_file_basic(file_path, repo_root)
+    
+    cache_path = None
+    try:
+        cache_path = _ast_cache_path(file_path, repo_root)
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable parse cache for {file_path}: {e}")
+    
+    nodes = parse_file_basic(file_path, repo_root)
+    if cache_path is not None:
+        try:
+            AST_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(nodes, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.debug(f"Failed to write parse cache for {file_path}: {e}")
+    return nodes
+
+def _parse_file_task(file_path: str, repo_root: str, use_cache: bool = False):
+    """Parse one file, returning (nodes, error) so failures survive a process pool."""
+    try:
+        if use_cache:
+            return parse_file_cached(file_path, repo_root), None
+        return parse_file_basic(file_path, repo_root), None
+    except Exception as e:
+        return [], str(e)
+
+def parse_repository(repo_path: str, output_file: str = None, use_cache: bool = False,
+                     max_workers: Optional[int] = None) -> Dict[str, Any]:
     """
     Parse repository and generate graph with multi-language support.
     
@@ -148,6 +292,11 @@ def parse_repository(repo_path: str, output_file: str = None) -> Dict[str, Any]:
     Args:
         repo_path: Path to repository
         output_file: Output file for graph.json
+        use_cache: Reuse the graph from a previous parse when no parseable
+            file has changed since (see GRAPH_CACHE_DIR), and otherwise
+            reuse per-file results for unchanged Python files (see AST_CACHE_DIR)
+        max_workers: Processes used to parse repositories with at least
+            PARALLEL_PARSE_MIN_FILES files (None = CPU count, 1 = sequential)
         
     Returns:
         Graph data with nodes and edges in standardized format
@@ -158,32 +307,52 @@ def parse_repository(repo_path: str, output_file: str = None) -> Dict[str, Any]:
         logger.error(f"Repository path does not exist: {repo_path}")
         return {"nodes": [], "edges": [], "error": "Repository path not found"}
     
+    fingerprint = None
+    if use_cache:
+        fingerprint = repository_fingerprint(repo_path, exclude=output_file)
+        graph_data = _load_cached_graph(fingerprint)
+        if graph_data is not None:
+            logger.info(f"Using cached graph for {repo_path} ({len(graph_data['nodes'])} nodes)")
+            if output_file:
+                _write_graph_file(graph_data, output_file)
+            return graph_data
+    
     try:
         # Parse all supported files in repository
         nodes = []
-        supported_extensions = set(LANGUAGE_PARSERS.keys())
         processed_files = 0
+        languages = set()
         
-        for root, dirs, files in os.walk(repo_path):
-            # Skip common ignore directories
-            dirs[:] = [d for d in dirs if d not in {'.git', '__pycache__', 'node_modules', '.vscode', '.idea', 'build', 'dist', 'target'}]
-            
-            for file in files:
-                file_path = os.path.join(root, file)
-                extension = get_file_extension(file_path)
+        file_paths = list(iter_source_files(repo_path, exclude=output_file))
+        
+        # AST parsing is CPU-bound, so large repositories are parsed across
+        # processes; map() keeps results in file order either way
+        if max_workers != 1 and len(file_paths) >= PARALLEL_PARSE_MIN_FILES:
+            logger.info(f"Parsing {len(file_paths)} files in parallel")
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+            results = executor.map(_parse_file_task, file_paths, repeat(repo_path), repeat(use_cache), chunksize=16)
+        else:
+            executor = None
+            results = map(_parse_file_task, file_paths, repeat(repo_path), repeat(use_cache))
+        
+        try:
+            for file_path, (file_nodes, error) in zip(file_paths, results):
+                if error:
+                    logger.warning(f"Failed to parse {file_path}: {error}")
+                    continue
                 
-                # Process supported file types
-                if extension in supported_extensions or not extension:
-                    try:
-                        file_nodes = parse_file_basic(file_path, repo_path)
-                        nodes.extend(file_nodes)
-                        processed_files += 1
-                        
-                        if processed_files % 20 == 0:
-                            logger.info(f"Processed {processed_files} files...")
-                            
-                    except Exception as e:
-                        logger.warning(f"Failed to parse {file_path}: {e}")
+                nodes.extend(file_nodes)
+                processed_files += 1
+                # Track languages while nodes are hot instead of rescanning all nodes later
+                for file_node in file_nodes:
+                    if file_node.get('language'):
+                        languages.add(file_node['language'])
+                
+                if processed_files % 20 == 0:
+                    logger.info(f"Processed {processed_files} files...")
+        finally:
+            if executor:
+                executor.shutdown()
         
         # Extract basic relationships
         edges = extract_basic_relationships(nodes)
@@ -197,17 +366,17 @@ def parse_repository(repo_path: str, output_file: str = None) -> Dict[str, Any]:
                 "node_count": len(nodes),
                 "edge_count": len(edges),
                 "files_processed": processed_files,
-                "supported_languages": list(set(n.get('language') for n in nodes if n.get('language'))),
+                "supported_languages": list(languages),
                 "generated_by": "RepoCanvas multi-language parser",
                 "schema_version": "2.0"
             }
         }
         
         if output_file:
-            Path(output_file).parent.mkdir(parents=True, exist_ok=True)
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(graph_data, f, indent=2, ensure_ascii=False)
-            logger.info(f"Saved graph to {output_file}")
+            _write_graph_file(graph_data, output_file)
+        
+        if fingerprint:
+            _store_cached_graph(fingerprint, graph_data)
         
         return graph_data
         
@@ -272,7 +441,8 @@ def parse_python_file_basic(file_path: str, content: str, relative_path: str) ->
     lines = content.splitlines()
     
     try:
-        tree = ast.parse(content)
+        # Same as ast.parse, without its wrapper overhead
+        tree = compile(content, file_path, 'exec', ast.PyCF_ONLY_AST)
         
         for node in ast.walk(tree):
             if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
@@ -449,7 +619,25 @@ def build_dependency_graph(functions: List[Dict[str, Any]]) -> Dict[str, Any]:
 
 # Wrapper functions for backward compatibility with worker app
 
-def build_repository_graph(repo_root, output_path=None):
+class SimpleGraph:
+    """Simple NetworkX-like graph object for compatibility."""
+    
+    def __init__(self, nodes, edges):
+        self._node_list = nodes
+        self.edges = edges
+    
+    @cached_property
+    def nodes(self):
+        # Built on first access; most callers only need the node list and edges
+        return {node['id']: node for node in self._node_list}
+    
+    def number_of_nodes(self):
+        return len(self.nodes)
+    
+    def number_of_edges(self):
+        return len(self.edges)
+
+def build_repository_graph(repo_root, output_path=None, use_cache=False, max_workers=None):
     """
     Wrapper around parse_repository for backward compatibility.
     Returns (nodes, edges, graph) tuple.
@@ -457,16 +645,10 @@ def build_repository_graph(repo_root, output_path=None):
     if output_path is None:
         output_path = os.path.join(repo_root, "graph.json")
     
-    graph_data = parse_repository(repo_root, output_path)
+    graph_data = parse_repository(repo_root, output_path, use_cache=use_cache, max_workers=max_workers)
     nodes = graph_data.get('nodes', [])
     edges = graph_data.get('edges', [])
     
-    # Create a simple NetworkX-like graph object for compatibility
-    class SimpleGraph:
-        def __init__(self, nodes, edges):
-            self.nodes = {node['id']: node for node in nodes}
-            self.edges = edges
-    
     graph = SimpleGraph(nodes, edges)
     return nodes, edges, graph
 
@@ -499,7 +681,7 @@ def make_document_for_node(node, max_lines=40):
     document_parts.append(f"# {title}")
     
     # Signature section
-    signature = snippet.split('\n')[0] if snippet else ""
+    signature = snippet_lines[0] if snippet_lines else ""
     if signature:
         document_parts.append(f"\n## Signature\n```python\n{signature}\n```")
     
@@ -549,13 +731,17 @@ def generate_embedding_documents(nodes, max_lines=40, save_files=True, documents
                 logger.warning(f"Failed to save document {file_path}: {e}")
                 file_paths.append("")
     
+    # Summed once and reused for the average
+    total_characters = sum(map(len, documents))
+    files_saved = sum(1 for path in file_paths if path)
+    
     metadata = {
         'total_documents': len(documents),
-        'total_characters': sum(len(doc) for doc in documents),
-        'average_characters': sum(len(doc) for doc in documents) / len(documents) if documents else 0,
+        'total_characters': total_characters,
+        'average_characters': total_characters / len(documents) if documents else 0,
         'max_lines_per_doc': max_lines,
         'documents_dir': documents_dir if save_files else None,
-        'files_saved': len([p for p in file_paths if p]) if save_files else 0
+        'files_saved': files_saved if save_files else 0
     }
     
     return {
@@ -564,24 +750,123 @@ def generate_embedding_documents(nodes, max_lines=40, save_files=True, documents
         'metadata': metadata
     }
 
-def build_repository_with_documents(repo_root, output_path=None, documents_dir="data/documents", max_lines=40):
+def documents_sidecar_path(graph_path: str) -> Path:
+    """Location of the precomputed documents stored next to a graph.json."""
+    return Path(graph_path).with_suffix('.documents.json')
+
+# Bump when make_document_for_node changes the documents it produces
+DOCUMENT_FORMAT_VERSION = 1
+
+def _nodes_digest(nodes: List[Dict[str, Any]], max_lines: int = 40) -> str:
+    """
+    Hash everything a node's document depends on: the whole node, the
+    snippet length and the document format.
+    """
+    digest = hashlib.blake2b(f"{DOCUMENT_FORMAT_VERSION}\0{max_lines}\n".encode('utf-8'), digest_size=16)
+    for node in nodes:
+        digest.update(orjson.dumps(node, option=orjson.OPT_SORT_KEYS))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+def save_documents_sidecar(graph_path: str, nodes: List[Dict[str, Any]],
+                           documents: Optional[List[str]] = None, max_lines: int = 40) -> None:
+    """
+    Persist node documents next to graph.json so indexing can skip rebuilding
+    them. Documents are generated from the nodes when not given; max_lines
+    must match the value they were built with.
+    """
+    if documents is None:
+        documents = [make_document_for_node(node, max_lines=max_lines) for node in nodes]
+    sidecar = documents_sidecar_path(graph_path)
+    try:
+        tmp_file = sidecar.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps({'nodes_digest': _nodes_digest(nodes, max_lines), 'documents': documents}))
+        os.replace(tmp_file, sidecar)
+    except Exception as e:
+        logger.warning(f"Failed to write documents side-car {sidecar}: {e}")
+
+def load_documents_sidecar(graph_path: str, nodes: List[Dict[str, Any]],
+                           max_lines: int = 40) -> Optional[List[str]]:
+    """
+    Return the precomputed documents for these nodes, or None if the
+    side-car is missing or was written for nodes that differ in any field
+    (or with a different max_lines or document format).
+    """
+    # JSON rather than pickle: graph_path comes from API requests, and
+    # loading a pickle from an arbitrary path could run arbitrary code
+    sidecar = documents_sidecar_path(graph_path)
+    try:
+        with open(sidecar, 'rb') as f:
+            data = orjson.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable documents side-car {sidecar}: {e}")
+        return None
+    
+    if not isinstance(data, dict) or data.get('nodes_digest') != _nodes_digest(nodes, max_lines):
+        return None
+    documents = data.get('documents')
+    if not isinstance(documents, list) or len(documents) != len(nodes):
+        return None
+    return documents
+
+def persist_qdrant_mapping(mapping: Dict[int, str], output_path: str) -> None:
+    """Save a Qdrant point_id -> node_id mapping as JSON."""
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = f"{output_path}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(orjson.dumps(mapping, option=orjson.OPT_NON_STR_KEYS))
+    os.replace(tmp_file, output_path)
+    logger.info(f"Saved {len(mapping)} Qdrant point mappings to {output_path}")
+
+def persist_index_metadata(collection_name: str, model_name: str, points_count: int,
+                           output_path: str = "data/index_status.json") -> None:
+    """Record which collection and model an index run produced, and when."""
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = f"{output_path}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(orjson.dumps({
+            "status": "completed",
+            "collection_name": collection_name,
+            "model_name": model_name,
+            "points_count": points_count,
+            "indexed_at": datetime.now(timezone.utc).isoformat()
+        }, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_file, output_path)
+    logger.info(f"Saved index metadata to {output_path}")
+
+def load_qdrant_mapping(path: str) -> Dict[int, str]:
+    """Load a point_id -> node_id mapping written by persist_qdrant_mapping."""
+    with open(path, 'rb') as f:
+        return {int(point_id): node_id for point_id, node_id in orjson.loads(f.read()).items()}
+
+def build_repository_with_documents(repo_root, output_path=None, documents_dir="data/documents", max_lines=40,
+                                    save_documents=True, max_workers=None):
     """
     Complete pipeline: build repository graph and generate semantic documents.
+    
+    Documents are always returned in memory; set save_documents=False when
+    they are consumed directly (e.g. embedded right away) to skip writing
+    one markdown file per node. max_workers is passed to parse_repository.
     """
     print(f"🚀 Starting complete repository analysis...")
     print(f"   Repository: {repo_root}")
     print(f"   Documents directory: {documents_dir}")
     
     # Build repository graph
-    nodes, edges, graph = build_repository_graph(repo_root, output_path)
+    nodes, edges, graph = build_repository_graph(repo_root, output_path, max_workers=max_workers)
     
     # Generate semantic documents
     doc_results = generate_embedding_documents(
         nodes, 
         max_lines=max_lines, 
-        save_files=True, 
+        save_files=save_documents, 
         documents_dir=documents_dir
     )
+    if output_path and save_documents:
+        save_documents_sidecar(output_path, nodes, doc_results['documents'], max_lines=max_lines)
     
     results = {
         'nodes': nodes,
@@ -5,10 +5,23 @@ import subprocess
 from git import Repo
 from git.exc import GitCommandError, InvalidGitRepositoryError
 
+# Partial-clone filter: skip blobs outside the checked-out tree
+PARTIAL_CLONE_FILTER = "blob:none"
+
+def _reset_dir(path: str):
+    """Remove and recreate a directory so git can clone into it."""
+    if os.path.exists(path):
+        shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
 def clone_repo(repo_url: str, dest_dir: str, branch: str = "main", depth: int = 1):
     """
     Clone a git repository using GitPython with subprocess fallback.
     
+    Only the tip of the requested branch is fetched (--depth, --single-branch,
+    --filter=blob:none); if the server rejects the partial clone, a plain
+    shallow clone is used instead.
+    
     Args:
         repo_url (str): The URL of the repository to clone
         dest_dir (str): Destination directory for the cloned repository
@@ -34,19 +47,24 @@ def clone_repo(repo_url: str, dest_dir: str, branch: str = "main", depth: int =
     except OSError as e:
         raise Exception(f"Failed to create destination directory '{dest_dir}': {e}")
     
-    # Try GitPython first
+    # Try GitPython first: shallow, single-branch, partial (blobless) clone
     try:
-        Repo.clone_from(repo_url, dest_dir, branch=branch, depth=depth)
+        Repo.clone_from(repo_url, dest_dir, branch=branch, depth=depth,
+                        single_branch=True, filter=PARTIAL_CLONE_FILTER)
         return dest_dir
     except (GitCommandError, InvalidGitRepositoryError) as e:
-        print(f"GitPython failed: {e}. Falling back to subprocess git command...")
+        print(f"GitPython partial clone failed: {e}. Retrying without --filter...")
     except Exception as e:
         print(f"GitPython failed with unexpected error: {e}. Falling back to subprocess git command...")
     
-    # Fallback to subprocess git if GitPython fails
+    # Older git versions and some servers refuse partial clone; a failed
+    # attempt can leave files behind, so start from an empty directory
+    _reset_dir(dest_dir)
+    
+    # Fallback to a plain shallow single-branch clone via subprocess git
     try:
         subprocess.check_call(
-            ["git", "clone", "--depth", str(depth), "-b", branch, repo_url, dest_dir],
+            ["git", "clone", "--depth", str(depth), "--single-branch", "-b", branch, repo_url, dest_dir],
             stderr=subprocess.STDOUT
         )
         return dest_dir
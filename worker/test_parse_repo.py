@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for the RepoCanvas Worker repository parser
+"""
+
+from parse_repo import build_repository_graph, make_document_for_node, parse_python_file_basic
+
+
+def test_parse_produces_nodes_and_edges(parsed_graph):
+    """Parsing the worker directory yields nodes, edges and matching metadata"""
+    nodes = parsed_graph["nodes"]
+    edges = parsed_graph["edges"]
+    metadata = parsed_graph["metadata"]
+    
+    assert nodes, "expected nodes from the worker directory"
+    assert metadata["node_count"] == len(nodes)
+    assert metadata["edge_count"] == len(edges)
+    assert "python" in metadata["supported_languages"]
+
+
+def test_nodes_follow_schema(parsed_graph):
+    """Every node carries the standardized fields and a known type"""
+    for node in parsed_graph["nodes"]:
+        assert {"id", "name", "type", "file", "start_line", "end_line", "code"} <= node.keys()
+        assert node["type"] in {"FUNCTION", "CLASS", "FILE"}
+
+
+def test_parser_finds_its_own_functions(parsed_graph):
+    """The parser module's own functions show up as FUNCTION nodes"""
+    function_names = {
+        node["name"] for node in parsed_graph["nodes"]
+        if node["type"] == "FUNCTION" and node["file"] == "parse_repo.py"
+    }
+    assert {"parse_repository", "build_repository_graph", "make_document_for_node"} <= function_names
+
+
+def test_edges_reference_existing_nodes(parsed_graph):
+    """Edges only connect nodes that exist in the graph"""
+    node_ids = {node["id"] for node in parsed_graph["nodes"]}
+    for edge in parsed_graph["edges"]:
+        assert edge["source"] in node_ids
+        assert edge["target"] in node_ids
+
+
+def test_make_document_for_node(parsed_graph):
+    """Documents include the node title and signature"""
+    node = next(n for n in parsed_graph["nodes"] if n["type"] == "FUNCTION")
+    document = make_document_for_node(node)
+    assert node["name"] in document
+    assert "## Signature" in document
+
+
+def test_parse_python_file_basic():
+    """Functions and classes in a small snippet become nodes"""
+    code = "class Greeter:\n    def greet(self):\n        return 'hi'\n\nasync def main():\n    pass\n"
+    nodes = parse_python_file_basic("example.py", code, "example.py")
+    
+    names = {(node["type"], node["name"]) for node in nodes}
+    assert names == {("CLASS", "Greeter"), ("FUNCTION", "greet"), ("FUNCTION", "main")}
+
+
+def test_build_repository_graph_uses_cache(tmp_path, monkeypatch):
+    """A second parse of an unchanged repository is served from the graph cache"""
+    import parse_repo
+    monkeypatch.setattr(parse_repo, "GRAPH_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(parse_repo, "AST_CACHE_DIR", tmp_path / "ast_cache")
+    
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "app.py").write_text("def handler():\n    return helper()\n\ndef helper():\n    return 1\n")
+    
+    nodes, edges, graph = build_repository_graph(str(repo), str(tmp_path / "graph.json"), use_cache=True)
+    assert list((tmp_path / "cache").glob("*.pkl"))
+    
+    cached_nodes, cached_edges, cached_graph = build_repository_graph(str(repo), str(tmp_path / "graph.json"), use_cache=True)
+    assert cached_nodes == nodes
+    assert cached_edges == edges
+    assert cached_graph.number_of_nodes() == graph.number_of_nodes()
+
+
+def test_parse_file_cached_reuses_unchanged_files(tmp_path, monkeypatch):
+    """Unchanged Python files are served from the per-file parse cache"""
+    import parse_repo
+    monkeypatch.setattr(parse_repo, "AST_CACHE_DIR", tmp_path / "ast_cache")
+    
+    source = tmp_path / "module.py"
+    source.write_text("def first():\n    pass\n")
+    nodes = parse_repo.parse_file_cached(str(source), str(tmp_path))
+    assert [n["name"] for n in nodes] == ["first"]
+    assert len(list((tmp_path / "ast_cache").glob("*.pkl"))) == 1
+    
+    calls = []
+    monkeypatch.setattr(parse_repo, "parse_file_basic", lambda *args: calls.append(args) or [])
+    assert parse_repo.parse_file_cached(str(source), str(tmp_path)) == nodes
+    assert not calls
+
+
+
+def test_parser_version_changes_cache_keys(tmp_path, monkeypatch):
+    """Graph and per-file cache keys change when the parser changes"""
+    import parse_repo
+    
+    source = tmp_path / "module.py"
+    source.write_text("def first():\n    pass\n")
+    fingerprint = parse_repo.repository_fingerprint(str(tmp_path))
+    cache_path = parse_repo._ast_cache_path(str(source), str(tmp_path))
+    
+    monkeypatch.setattr(parse_repo, "PARSER_VERSION", "changed")
+    assert parse_repo.repository_fingerprint(str(tmp_path)) != fingerprint
+    assert parse_repo._ast_cache_path(str(source), str(tmp_path)) != cache_path
+
+
+def test_documents_sidecar_round_trip(tmp_path):
+    """Side-car documents are reused only for the nodes they were built from"""
+    from parse_repo import load_documents_sidecar, save_documents_sidecar
+    
+    graph_path = str(tmp_path / "graph.json")
+    nodes = [{"id": "function:a", "name": "a", "code": "def a():\n    pass"}]
+    
+    assert load_documents_sidecar(graph_path, nodes) is None
+    save_documents_sidecar(graph_path, nodes)
+    assert load_documents_sidecar(graph_path, nodes) == [make_document_for_node(nodes[0])]
+    assert load_documents_sidecar(graph_path, nodes + [{"id": "function:b"}]) is None
+    assert load_documents_sidecar(graph_path, [{**nodes[0], "code": "def a():\n    return 2"}]) is None
+    assert load_documents_sidecar(graph_path, [{**nodes[0], "start_line": 40}]) is None
+    assert load_documents_sidecar(graph_path, [{**nodes[0], "file": "other.py"}]) is None
+    assert load_documents_sidecar(graph_path, nodes, max_lines=10) is None
+
+
+def test_qdrant_mapping_round_trip(tmp_path):
+    """Point ids survive the JSON round trip as integers"""
+    from parse_repo import load_qdrant_mapping, persist_qdrant_mapping
+    
+    path = str(tmp_path / "maps" / "repocanvas.json")
+    persist_qdrant_mapping({1: "function:a", 2: "class:B"}, path)
+    assert load_qdrant_mapping(path) == {1: "function:a", 2: "class:B"}
+
+
+def test_persist_index_metadata(tmp_path):
+    """Index metadata records the collection, model and point count"""
+    import orjson
+    from parse_repo import persist_index_metadata
+    
+    output_path = tmp_path / "index_status.json"
+    persist_index_metadata("demo", "all-MiniLM-L6-v2", 5, str(output_path))
+    
+    metadata = orjson.loads(output_path.read_bytes())
+    assert metadata["status"] == "completed"
+    assert metadata["collection_name"] == "demo"
+    assert metadata["points_count"] == 5
+    assert "indexed_at" in metadata